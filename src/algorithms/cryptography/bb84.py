@@ -0,0 +1,92 @@
+# src/algorithms/cryptography/bb84.py
+
+import numpy as np
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+def random_bits(rng, size):
+    """Draw ``size`` uniform random bits as a uint8 array, eight per random byte."""
+    return np.unpackbits(rng.integers(0, 256, (size + 7) // 8, dtype=np.uint8))[:size]
+
+def estimate_qber(alice_key, bob_key, sample_fraction, rng):
+    """Disclose a random sample of the sifted keys and estimate the bit error rate.
+
+    Returns ``(qber, keep)`` where ``keep`` masks the undisclosed positions
+    that remain usable as key.
+    """
+    length = len(alice_key)
+    sample = rng.random(length) < sample_fraction
+    disclosed = int(sample.sum())
+    errors = int(np.count_nonzero(alice_key[sample] != bob_key[sample]))
+    qber = errors / disclosed if disclosed else 0.0
+    return qber, ~sample
+
+class BB84Engine:
+    """Circuit-free BB84 simulation on NumPy bit arrays.
+
+    Every transmitted qubit is described by its bit and basis, so preparation,
+    intercept-resend eavesdropping, measurement and sifting are elementwise
+    array operations. ``channel_error`` flips each received bit independently;
+    ``eavesdrop_rate`` is the fraction of qubits Eve measures in a random basis
+    and resends. Long keys are processed ``chunk_bits`` at a time.
+    """
+
+    def __init__(self, channel_error=0.0, eavesdrop_rate=0.0, sample_fraction=0.1, chunk_bits=1 << 22):
+        self.channel_error = channel_error
+        self.eavesdrop_rate = eavesdrop_rate
+        self.sample_fraction = sample_fraction
+        self.chunk_bits = chunk_bits
+
+    def transmit(self, num_bits, rng):
+        """Send ``num_bits`` qubits and return Alice's and Bob's sifted keys.
+
+        Returns a dict with uint8 arrays ``alice_key`` and ``bob_key`` holding
+        the positions where Alice and Bob chose the same basis.
+        """
+        alice_keys, bob_keys = [], []
+        for start in range(0, num_bits, self.chunk_bits):
+            size = min(self.chunk_bits, num_bits - start)
+            alice_bits = random_bits(rng, size)
+            alice_bases = random_bits(rng, size)
+            bob_bases = random_bits(rng, size)
+
+            # State on the channel: Alice's, unless Eve measured and resent it
+            state_bits, state_bases = alice_bits, alice_bases
+            if self.eavesdrop_rate:
+                intercepted = rng.random(size) < self.eavesdrop_rate
+                eve_bases = random_bits(rng, size)
+                eve_bits = np.where(eve_bases == alice_bases, alice_bits, random_bits(rng, size))
+                state_bits = np.where(intercepted, eve_bits, alice_bits)
+                state_bases = np.where(intercepted, eve_bases, alice_bases)
+
+            # Measuring in the wrong basis gives a uniformly random bit
+            bob_bits = np.where(bob_bases == state_bases, state_bits, random_bits(rng, size))
+            if self.channel_error:
+                bob_bits = bob_bits ^ (rng.random(size) < self.channel_error).astype(np.uint8)
+
+            sifted = alice_bases == bob_bases
+            alice_keys.append(alice_bits[sifted])
+            bob_keys.append(bob_bits[sifted])
+        return {'alice_key': np.concatenate(alice_keys) if alice_keys else np.zeros(0, dtype=np.uint8),
+                'bob_key': np.concatenate(bob_keys) if bob_keys else np.zeros(0, dtype=np.uint8)}
+
+    def run(self, num_bits, rng=None):
+        """Run BB84 over ``num_bits`` qubits, estimate the QBER and drop the disclosed sample.
+
+        Returns a dict with ``alice_key``, ``bob_key`` (the remaining sifted
+        keys), ``qber``, ``sifted_length`` and ``disclosed``.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        keys = self.transmit(num_bits, rng)
+        qber, keep = estimate_qber(keys['alice_key'], keys['bob_key'], self.sample_fraction, rng)
+        result = {
+            'alice_key': keys['alice_key'][keep],
+            'bob_key': keys['bob_key'][keep],
+            'qber': qber,
+            'sifted_length': len(keys['alice_key']),
+            'disclosed': int(len(keep) - keep.sum()),
+        }
+        logging.info(f"BB84: {num_bits} qubits, {result['sifted_length']} sifted bits, QBER {qber:.4f}")
+        return result
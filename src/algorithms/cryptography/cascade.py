@@ -0,0 +1,117 @@
+# src/algorithms/cryptography/cascade.py
+
+import numpy as np
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# First-pass block count when the estimated QBER is zero. A sample with no
+# errors does not prove the key has none, and one block per pass would miss
+# every even number of them.
+ZERO_QBER_BLOCKS = 8
+
+def initial_block_size(qber, length):
+    """First-pass Cascade block size, about 0.73 / QBER bits, within ``[4, length]``."""
+    if qber <= 0:
+        return max(1, min(length, max(4, length // ZERO_QBER_BLOCKS)))
+    return int(min(max(4, np.ceil(0.73 / qber)), max(1, length)))
+
+def _prefix_parity(bits):
+    """``prefix[i]`` is the XOR of the first ``i`` bits."""
+    prefix = np.zeros(len(bits) + 1, dtype=np.uint8)
+    np.bitwise_xor.accumulate(bits, out=prefix[1:])
+    return prefix
+
+class _Pass:
+    """One Cascade pass: a shuffled order of the key cut into equal blocks."""
+
+    def __init__(self, order, block_size, alice):
+        self.order = order
+        self.position = np.empty_like(order)
+        self.position[order] = np.arange(len(order))
+        self.block_size = block_size
+        self.alice_prefix = _prefix_parity(alice[order])
+        starts = np.arange(0, len(order), block_size)
+        self.starts = starts
+        self.stops = np.minimum(starts + block_size, len(order))
+
+    def parities(self, prefix):
+        return prefix[self.stops] ^ prefix[self.starts]
+
+    def blocks_of(self, indices):
+        return self.position[indices] // self.block_size
+
+class Cascade:
+    """Cascade information reconciliation between Alice's and Bob's sifted keys.
+
+    Each pass shuffles the key with a permutation both sides derive from a
+    public ``seed``, compares block parities and binary-searches every block
+    with odd parity difference, all blocks at once. Each corrected bit flips the
+    parity of the block containing it in every pass so far; those blocks are
+    searched again until no pass has an odd block left. Block sizes start at
+    about ``0.73 / qber`` (an eighth of the key when the estimate is zero) and
+    double every pass. Every parity Alice discloses
+    counts towards ``leaked``.
+    """
+
+    def __init__(self, passes=4, seed=None):
+        self.passes = passes
+        self.seed = seed
+
+    def _search(self, reconciled_pass, blocks, bob):
+        """Binary-search the given odd blocks of one pass; returns error indices and parities used."""
+        bob_prefix = _prefix_parity(bob[reconciled_pass.order])
+        alice_prefix = reconciled_pass.alice_prefix
+        low, high = reconciled_pass.starts[blocks], reconciled_pass.stops[blocks]
+        disclosed = 0
+        active = high - low > 1
+        while active.any():
+            middle = (low + high) // 2
+            # Parity of the lower half differs -> the error is in the lower half
+            lower_differs = (alice_prefix[middle] ^ alice_prefix[low]) != (bob_prefix[middle] ^ bob_prefix[low])
+            high = np.where(active & lower_differs, middle, high)
+            low = np.where(active & ~lower_differs, middle, low)
+            disclosed += int(active.sum())
+            active = high - low > 1
+        return reconciled_pass.order[low], disclosed
+
+    def reconcile(self, alice_key, bob_key, qber):
+        """Correct ``bob_key`` towards ``alice_key``.
+
+        Keys are arrays of 0/1 bits. Returns a dict with the corrected ``key``,
+        the number of ``leaked`` parity bits, the number of ``corrected`` bits and
+        the ``block_sizes`` used.
+        """
+        alice = np.asarray(alice_key, dtype=np.uint8)
+        bob = np.asarray(bob_key, dtype=np.uint8).copy()
+        length = len(alice)
+        rng = np.random.default_rng(self.seed)
+        passes, mismatches = [], []
+        leaked = corrected = 0
+        block_size = initial_block_size(qber, length)
+        for index in range(self.passes if length else 0):
+            order = np.arange(length) if index == 0 else rng.permutation(length)
+            current = _Pass(order, block_size, alice)
+            passes.append(current)
+            mismatches.append(current.parities(current.alice_prefix) ^ current.parities(_prefix_parity(bob[order])))
+            leaked += len(current.starts)
+
+            # Search the odd blocks of every pass until corrections stop cascading
+            while True:
+                pending = [(number, np.flatnonzero(mismatch)) for number, mismatch in enumerate(mismatches)]
+                pending = [(number, blocks) for number, blocks in pending if blocks.size]
+                if not pending:
+                    break
+                number, blocks = pending[-1]
+                errors, disclosed = self._search(passes[number], blocks, bob)
+                leaked += disclosed
+                corrected += len(errors)
+                bob[errors] ^= 1
+                for earlier, mismatch in zip(passes, mismatches):
+                    np.bitwise_xor.at(mismatch, earlier.blocks_of(errors), 1)
+            block_size = min(2 * block_size, max(1, length))
+
+        logging.info(f"Cascade: corrected {corrected} of {length} bits, leaked {leaked} parity bits")
+        return {'key': bob, 'leaked': leaked, 'corrected': corrected,
+                'block_sizes': [reconciled_pass.block_size for reconciled_pass in passes]}
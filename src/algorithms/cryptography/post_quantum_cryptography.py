@@ -1,15 +1,21 @@
 # src/algorithms/cryptography/post_quantum_cryptography.py
 
 from ntru import NTRU
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
 import json
 import os
 import time
+import base64
 import hashlib
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+# AES-256 session keys are encapsulated as 64 hexadecimal characters
+SESSION_KEY_BYTES = 32
+
 class PostQuantumCryptography:
     def __init__(self, p=11, q=127, d=1):
         self.ntru = NTRU(p, q, d)
@@ -19,6 +25,7 @@ class PostQuantumCryptography:
     def generate_keypair(self):
         """Generate a public/private key pair."""
         self.public_key, self.private_key = self.ntru.generate_keypair()
+        self.check_session_key_capacity()
         self.save_keys()
         logging.info("Generated and saved key pair.")
         return self.public_key, self.private_key
@@ -44,6 +51,19 @@ class PostQuantumCryptography:
         else:
             logging.error("Key file not found. Please generate keys first.")
 
+    def check_session_key_capacity(self):
+        """Check that one NTRU encryption carries a hybrid session key intact.
+
+        A session key is ``2 * SESSION_KEY_BYTES`` hexadecimal characters; NTRU
+        parameters whose message space is smaller would silently corrupt it, so
+        a random key is encapsulated and decapsulated with the current key pair.
+        """
+        session_key = get_random_bytes(SESSION_KEY_BYTES).hex()
+        recovered = self.ntru.decrypt(self.ntru.encrypt(session_key, self.public_key), self.private_key)
+        if recovered != session_key:
+            raise ValueError(f"NTRU parameters cannot carry a {8 * SESSION_KEY_BYTES}-bit session key; "
+                             f"choose parameters with a larger message space.")
+
     def encrypt(self, message: str) -> dict:
         """Encrypt a message using the public key."""
         start_time = time.time()
@@ -75,10 +95,49 @@ class PostQuantumCryptography:
         return plaintext
 
     def hybrid_encrypt(self, message: str) -> dict:
-        """Hybrid encryption using NTRU and symmetric encryption (e.g., AES)."""
-        # Placeholder for hybrid encryption implementation
-        logging.warning("Hybrid encryption is not yet implemented.")
-        return self.encrypt(message)
+        """Hybrid encryption using NTRU and symmetric encryption (e.g., AES).
+
+        A fresh 256-bit AES key is encapsulated with one NTRU encryption (see
+        :meth:`check_session_key_capacity`, run on key generation) and the
+        message is encrypted with AES-GCM under it. The GCM tag authenticates the
+        payload and, as associated data, the encapsulated key, replacing the
+        separate integrity hash of :meth:`encrypt`.
+        """
+        start_time = time.time()
+        session_key = get_random_bytes(SESSION_KEY_BYTES)
+        encapsulated_key = self.ntru.encrypt(session_key.hex(), self.public_key)
+        cipher = AES.new(session_key, AES.MODE_GCM)
+        cipher.update(encapsulated_key.encode())
+        ciphertext, tag = cipher.encrypt_and_digest(message.encode())
+        encryption_time = time.time() - start_time
+        logging.info(f"Hybrid encryption of {len(ciphertext)} bytes completed in {encryption_time:.4f} seconds.")
+        return {
+            'encapsulated_key': encapsulated_key,
+            'nonce': base64.b64encode(cipher.nonce).decode(),
+            'ciphertext': base64.b64encode(ciphertext).decode(),
+            'tag': base64.b64encode(tag).decode()
+        }
+
+    def hybrid_decrypt(self, encrypted_data: dict) -> str:
+        """Decrypt the output of :meth:`hybrid_encrypt` using the private key."""
+        start_time = time.time()
+        encapsulated_key = encrypted_data['encapsulated_key']
+
+        # Verify integrity while decrypting; a damaged encapsulated key yields a wrong AES key
+        try:
+            session_key = bytes.fromhex(self.ntru.decrypt(encapsulated_key, self.private_key))
+            if len(session_key) != SESSION_KEY_BYTES:
+                raise ValueError("Decapsulated session key has the wrong length")
+            cipher = AES.new(session_key, AES.MODE_GCM, nonce=base64.b64decode(encrypted_data['nonce']))
+            cipher.update(encapsulated_key.encode())
+            plaintext = cipher.decrypt_and_verify(base64.b64decode(encrypted_data['ciphertext']),
+                                                  base64.b64decode(encrypted_data['tag']))
+        except ValueError:
+            logging.error("Integrity check failed! The ciphertext may have been tampered with.")
+            raise ValueError("Integrity check failed!")
+        decryption_time = time.time() - start_time
+        logging.info(f"Hybrid decryption completed in {decryption_time:.4f} seconds.")
+        return plaintext.decode()
 
 # Example usage
 if __name__ == "__main__":
@@ -92,3 +151,7 @@ if __name__ == "__main__":
 
     decrypted_message = pqc_instance.decrypt(encrypted_data)
     logging.info(f"Decrypted Message: {decrypted_message}")
+
+    hybrid_data = pqc_instance.hybrid_encrypt(message * 1000)
+    logging.info(f"Hybrid ciphertext size: {len(hybrid_data['ciphertext'])} characters")
+    assert pqc_instance.hybrid_decrypt(hybrid_data) == message * 1000
@@ -1,18 +1,32 @@
 # src/algorithms/cryptography/qkd.py
 
 import numpy as np
-from qiskit import QuantumCircuit, Aer, transpile, assemble, execute
+from qiskit import QuantumCircuit, Aer
+from qiskit.circuit import ParameterVector
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple
+from quantum_backends.transpile_cache import cached_transpile
+from quantum_backends.counts import Counts
+from algorithms.cryptography.bb84 import BB84Engine, estimate_qber
+from algorithms.cryptography.cascade import Cascade
+from algorithms.cryptography.privacy_amplification import secure_key_length, toeplitz_hash
+from algorithms.cryptography.qkd_session import run_session
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 class QKD:
-    def __init__(self, num_bits: int, num_runs: int = 1):
+    def __init__(self, num_bits: int, num_runs: int = 1, channel_error: float = 0.0,
+                 eavesdrop_rate: float = 0.0, sample_fraction: float = 0.1):
         self.num_bits = num_bits
         self.num_runs = num_runs
         self.secret_keys = []
+        self.engine = BB84Engine(channel_error, eavesdrop_rate, sample_fraction)
+        self.leaked_bits = 0
+        self.sessions = []
+        self._templates = {}
 
     def prepare_states(self) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare quantum states based on random bits and bases."""
@@ -23,36 +37,64 @@ class QKD:
 
     def encode(self, bits: np.ndarray, bases: np.ndarray) -> QuantumCircuit:
         """Encode bits into quantum states."""
-        circuit = QuantumCircuit(self.num_bits)
-        for i in range(self.num_bits):
-            if bases[i] == 0:  # Z-basis
-                if bits[i] == 1:
-                    circuit.x(i)  # Apply X gate for |1>
-            else:  # X-basis
-                if bits[i] == 1:
-                    circuit.h(i)  # Apply H gate for |+>
+        circuit = QuantumCircuit(len(bits))
+        for i in range(len(bits)):
+            if bits[i] == 1:
+                circuit.x(i)  # Apply X gate for |1>
+            if bases[i] == 1:  # X-basis
+                circuit.h(i)  # Apply H gate for |+> or |->
         return circuit
 
     def measure(self, circuit: QuantumCircuit, bases: np.ndarray) -> QuantumCircuit:
         """Measure the quantum states."""
-        for i in range(self.num_bits):
+        for i in range(len(bases)):
             if bases[i] == 1:
                 circuit.h(i)  # Change basis to X-basis
         circuit.measure_all()
         return circuit
 
+    def template(self, num_qubits: int) -> Tuple[QuantumCircuit, ParameterVector, ParameterVector]:
+        """Return the transpiled ``num_qubits``-wide BB84 circuit with symbolic angles.
+
+        Alice prepares every qubit as ``ry(theta)|0>`` and Bob rotates it by
+        ``ry(phi)`` before measuring, so all runs of one width share a single
+        structure: it is transpiled once and runs only bind their angles (see
+        :meth:`bind`). Returns ``(circuit, theta_parameters, phi_parameters)``.
+        """
+        if num_qubits not in self._templates:
+            theta = ParameterVector('theta', num_qubits)
+            phi = ParameterVector('phi', num_qubits)
+            circuit = QuantumCircuit(num_qubits)
+            for i in range(num_qubits):
+                circuit.ry(theta[i], i)
+                circuit.ry(phi[i], i)
+            circuit.measure_all()
+            self._templates[num_qubits] = (cached_transpile(circuit, Aer.get_backend('qasm_simulator')), theta, phi)
+        return self._templates[num_qubits]
+
+    def bind(self, bits: np.ndarray, bases: np.ndarray, measure_bases: np.ndarray) -> QuantumCircuit:
+        """Bind Alice's bits and bases and Bob's measurement bases into the template.
+
+        ``theta`` is 0 or pi in the Z basis and +-pi/2 (``|+>``/``|->``) in the X
+        basis; ``phi`` of -pi/2 maps the X basis back onto Z, like the Hadamard
+        in :meth:`measure`.
+        """
+        bits, bases, measure_bases = (np.asarray(values, dtype=float) for values in (bits, bases, measure_bases))
+        circuit, theta, phi = self.template(len(bits))
+        angles = np.where(bases == 1, np.pi / 2 * (1 - 2 * bits), np.pi * bits)
+        values = dict(zip(theta, angles.tolist()))
+        values.update(zip(phi, (-np.pi / 2 * measure_bases).tolist()))
+        return circuit.assign_parameters(values)
+
     def generate_key(self) -> List[int]:
         """Main method to generate a secret key using QKD."""
         bits, bases = self.prepare_states()
-        circuit = self.encode(bits, bases)
-        circuit = self.measure(circuit, bases)
+        circuit = self.bind(bits, bases, bases)
 
         # Execute the circuit
         backend = Aer.get_backend('qasm_simulator')
-        transpiled_circuit = transpile(circuit, backend)
-        qobj = assemble(transpiled_circuit)
-        result = execute(qobj, backend).result()
-        counts = result.get_counts()
+        result = backend.run(circuit).result()
+        counts = Counts.from_dict(result.get_counts(), self.num_bits)
 
         # Extract the key from measurement results
         secret_key = self.extract_key(counts)
@@ -60,37 +102,116 @@ class QKD:
         logging.info(f"Generated secret key: {secret_key}")
         return secret_key
 
+    def simulate(self, num_bits: int = None, rng: np.random.Generator = None) -> dict:
+        """Run BB84 on the vectorized engine and return the sifted keys and QBER.
+
+        See :meth:`BB84Engine.run`; ``num_bits`` defaults to ``self.num_bits``.
+        """
+        return self.engine.run(num_bits or self.num_bits, rng)
+
+    def simulate_circuit(self, num_bits: int = None, rng: np.random.Generator = None,
+                         max_width: int = 20) -> dict:
+        """Run noiseless BB84 through Qiskit circuits, for validating :meth:`simulate`.
+
+        Alice's qubits are encoded and measured in Bob's bases ``max_width`` at a
+        time with one shot each; the result has the same layout as ``simulate``.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        num_bits = num_bits or self.num_bits
+        bits = rng.integers(0, 2, num_bits, dtype=np.uint8)
+        alice_bases = rng.integers(0, 2, num_bits, dtype=np.uint8)
+        bob_bases = rng.integers(0, 2, num_bits, dtype=np.uint8)
+        backend = Aer.get_backend('qasm_simulator')
+        bob_bits = np.empty(num_bits, dtype=np.uint8)
+        for start in range(0, num_bits, max_width):
+            stop = min(start + max_width, num_bits)
+            circuit = self.bind(bits[start:stop], alice_bases[start:stop], bob_bases[start:stop])
+            counts = Counts.from_dict(backend.run(circuit, shots=1,
+                                                  seed_simulator=int(rng.integers(2 ** 31))).result().get_counts(),
+                                      stop - start)
+            bob_bits[start:stop] = (counts.most_frequent() >> np.arange(stop - start)) & 1
+        sifted = alice_bases == bob_bases
+        qber, keep = estimate_qber(bits[sifted], bob_bits[sifted], self.engine.sample_fraction, rng)
+        return {'alice_key': bits[sifted][keep], 'bob_key': bob_bits[sifted][keep], 'qber': qber,
+                'sifted_length': int(sifted.sum()), 'disclosed': int(len(keep) - keep.sum())}
+
     def extract_key(self, counts: dict) -> List[int]:
         """Extract the key from the measurement results."""
         # Assuming the most frequent measurement result is the key
-        return list(map(int, max(counts, key=counts.get)))
+        counts = Counts.from_dict(counts, self.num_bits)
+        outcome = counts.most_frequent()
+        # Bitstrings list the highest qubit first
+        return ((outcome >> np.arange(counts.num_bits - 1, -1, -1)) & 1).tolist()
+
+    def reconcile(self, alice_key: np.ndarray, bob_key: np.ndarray, qber: float,
+                  passes: int = 4, seed: int = None) -> dict:
+        """Reconcile Bob's key with Alice's using Cascade; see :meth:`Cascade.reconcile`."""
+        return Cascade(passes, seed).reconcile(alice_key, bob_key, qber)
+
+    def error_correction(self, key: List[int], reference: np.ndarray = None, qber: float = 0.05) -> List[int]:
+        """Correct ``key`` against Alice's ``reference`` key with Cascade.
 
-    def error_correction(self, key: List[int]) -> List[int]:
-        """Simple error correction (e.g., parity check)."""
-        # Placeholder for a more complex error correction algorithm
-        corrected_key = key  # In a real implementation, apply error correction
-        logging.info(f"Corrected key: {corrected_key}")
+        ``qber`` is the error rate estimated from the disclosed sample and sets
+        the block sizes. Without a reference there is nothing to reconcile
+        against and the key is returned unchanged. The disclosed parity bits are
+        added to ``leaked_bits``.
+        """
+        if reference is None:
+            logging.info(f"Corrected key: {key}")
+            return key
+        result = self.reconcile(reference, key, qber)
+        self.leaked_bits += result['leaked']
+        corrected_key = result['key'] if isinstance(key, np.ndarray) else result['key'].tolist()
+        logging.info(f"Corrected {result['corrected']} bits, leaked {result['leaked']} parity bits")
         return corrected_key
 
-    def privacy_amplification(self, key: List[int], epsilon: float) -> List[int]:
-        """Apply privacy amplification to reduce eavesdropping risk."""
-        # Placeholder for a more complex privacy amplification algorithm
-        amplified_key = key[:int(len(key) * (1 - epsilon))]  # Simple truncation
-        logging.info(f"Amplified key: {amplified_key}")
+    def privacy_amplification(self, key: List[int], epsilon: float, qber: float = 0.0, leaked: int = 0,
+                              seed: int = None) -> List[int]:
+        """Apply privacy amplification to reduce eavesdropping risk.
+
+        The key is compressed with a Toeplitz hash seeded by the public ``seed``
+        to ``n (1 - h(qber)) - leaked - 2 log2(1 / epsilon)`` bits, where
+        ``leaked`` counts the bits disclosed during error correction and
+        ``epsilon`` is the security parameter.
+        """
+        length = secure_key_length(len(key), qber, leaked, epsilon)
+        amplified_key = toeplitz_hash(key, length, seed)
+        if not isinstance(key, np.ndarray):
+            amplified_key = amplified_key.tolist()
+        logging.info(f"Amplified {len(key)} bits to {length} bits")
         return amplified_key
 
-    def run_multiple(self) -> List[List[int]]:
-        """Run the QKD process multiple times and return all keys."""
-        for _ in range(self.num_runs):
-            key = self.generate_key()
-            key = self.error_correction(key)
-            key = self.privacy_amplification(key, epsilon=0.1)
-            self.secret_keys.append(key)
+    def run_multiple(self, processes: int = 1, seed: int = None, epsilon: float = 1e-10) -> List[List[int]]:
+        """Run the QKD process multiple times and return all keys.
+
+        Each session runs the full BB84 -> Cascade -> privacy amplification
+        pipeline of :func:`run_session` with its own generator spawned from
+        ``seed``, so results do not depend on ``processes``. Sessions are spread
+        over a process pool, so different sessions go through different stages
+        at the same time. Every final key is appended to ``secret_keys`` as a
+        list of bits, which is returned as before; the per-session statistics
+        (QBER, leaked bits, key rate, ...) are kept in ``self.sessions``.
+        """
+        seeds = np.random.SeedSequence(seed).spawn(self.num_runs)
+        arguments = [(self.num_bits, self.engine.channel_error, self.engine.eavesdrop_rate,
+                      self.engine.sample_fraction, epsilon, 4, child) for child in seeds]
+        if processes > 1 and self.num_runs > 1:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(processes, self.num_runs), mp_context=context) as executor:
+                sessions = list(executor.map(run_session, *zip(*arguments)))
+        else:
+            sessions = [run_session(*session_arguments) for session_arguments in arguments]
+
+        self.sessions = sessions
+        for session in sessions:
+            self.secret_keys.append(np.unpackbits(session['key'], count=session['key_length']).tolist())
+            logging.info(f"Session key: {session['key_length']} bits, QBER {session['qber']:.4f}, "
+                         f"{session['key_rate']:.0f} bits/s")
         return self.secret_keys
 
 # Example usage
 if __name__ == "__main__":
-    qkd_instance = QKD(num_bits=10, num_runs=5)
-    all_keys = qkd_instance.run_multiple()
-    for i, key in enumerate(all _keys):
-        print(f"Run {i+1}: Secret Key {key}")
+    qkd_instance = QKD(num_bits=100000, num_runs=5, channel_error=0.02)
+    all_keys = qkd_instance.run_multiple(processes=2, seed=0)
+    for i, (key, session) in enumerate(zip(all_keys, qkd_instance.sessions)):
+        print(f"Run {i+1}: {len(key)}-bit secret key, QBER {session['qber']:.4f}")
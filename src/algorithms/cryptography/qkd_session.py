@@ -0,0 +1,41 @@
+# src/algorithms/cryptography/qkd_session.py
+
+import time
+import numpy as np
+from algorithms.cryptography.bb84 import BB84Engine
+from algorithms.cryptography.cascade import Cascade
+from algorithms.cryptography.privacy_amplification import secure_key_length, toeplitz_hash
+
+def run_session(num_bits, channel_error=0.0, eavesdrop_rate=0.0, sample_fraction=0.1, epsilon=1e-10,
+                passes=4, seed=None):
+    """Run one complete QKD session: BB84, Cascade and privacy amplification.
+
+    ``seed`` (an int or ``SeedSequence``) drives every random choice, including
+    the public Cascade permutations and Toeplitz seed, so a session is
+    reproducible. Kept free of Qiskit so process pools can import it cheaply.
+
+    Returns a dict with the final key packed into bytes (``key``, with
+    ``key_length`` bits) and the session statistics.
+    """
+    start_time = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    sifted = BB84Engine(channel_error, eavesdrop_rate, sample_fraction).run(num_bits, rng)
+    reconciled = Cascade(passes, int(rng.integers(2 ** 63))).reconcile(sifted['alice_key'], sifted['bob_key'],
+                                                                       sifted['qber'])
+    key_length = secure_key_length(len(sifted['alice_key']), sifted['qber'], reconciled['leaked'], epsilon)
+    hash_seed = int(rng.integers(2 ** 63))
+    alice_key = toeplitz_hash(sifted['alice_key'], key_length, hash_seed)
+    bob_key = toeplitz_hash(reconciled['key'], key_length, hash_seed)
+    elapsed = time.perf_counter() - start_time
+    return {
+        'key': np.packbits(bob_key),
+        'key_length': key_length,
+        'verified': bool(np.array_equal(alice_key, bob_key)),
+        'qber': sifted['qber'],
+        'sifted_length': sifted['sifted_length'],
+        'disclosed': sifted['disclosed'],
+        'leaked': reconciled['leaked'],
+        'corrected': reconciled['corrected'],
+        'elapsed': elapsed,
+        'key_rate': key_length / elapsed if elapsed else 0.0,
+    }
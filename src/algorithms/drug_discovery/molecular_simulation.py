@@ -1,5 +1,7 @@
 # src/algorithms/drug_discovery/molecular_simulation.py
 
+import os
+import json
 import numpy as np
 import matplotlib.pyplot as plt
 from numba import jit, prange
@@ -8,8 +10,485 @@ import logging
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+@jit(nopython=True)
+def lennard_jones_potential(r):
+    """Calculate the Lennard-Jones potential."""
+    return 4 * ((1 / r)**12 - (1 / r)**6)
+
+@jit(nopython=True)
+def _cell_grid_size(box_size, r_list):
+    """Number of cells per box edge; fewer than 3 collapses to a single cell."""
+    n_cells = int(box_size // r_list)
+    return n_cells if n_cells >= 3 else 1
+
+@jit(nopython=True)
+def build_cell_list(positions, box_size, n_cells):
+    """Bin particles into a cubic grid of n_cells**3 cells.
+
+    Returns ``(cell_start, cell_particles)`` where the particles of cell ``c`` are
+    ``cell_particles[cell_start[c]:cell_start[c + 1]]``.
+    """
+    num_particles = positions.shape[0]
+    cell_size = box_size / n_cells
+    cell_of = np.empty(num_particles, dtype=np.int64)
+    cell_start = np.zeros(n_cells**3 + 1, dtype=np.int64)
+    for i in range(num_particles):
+        c = 0
+        for d in range(3):
+            k = int(np.floor(positions[i, d] / cell_size)) % n_cells
+            c = c * n_cells + k
+        cell_of[i] = c
+        cell_start[c + 1] += 1
+    for c in range(n_cells**3):
+        cell_start[c + 1] += cell_start[c]
+    fill = cell_start[:-1].copy()
+    cell_particles = np.empty(num_particles, dtype=np.int64)
+    for i in range(num_particles):
+        c = cell_of[i]
+        cell_particles[fill[c]] = i
+        fill[c] += 1
+    return cell_start, cell_particles
+
+@jit(nopython=True)
+def _scan_neighbors(i, positions, box_size, r_list_sq, n_cells, cell_start, cell_particles, out, offset):
+    """Visit the neighbours of particle i within sqrt(r_list_sq).
+
+    Writes them to ``out[offset:]`` unless ``out`` is empty, and returns the count.
+    """
+    cell_size = box_size / n_cells
+    cx = int(np.floor(positions[i, 0] / cell_size)) % n_cells
+    cy = int(np.floor(positions[i, 1] / cell_size)) % n_cells
+    cz = int(np.floor(positions[i, 2] / cell_size)) % n_cells
+    reach = 1 if n_cells >= 3 else 0
+    count = 0
+    for ox in range(-reach, reach + 1):
+        for oy in range(-reach, reach + 1):
+            for oz in range(-reach, reach + 1):
+                c = (((cx + ox) % n_cells) * n_cells + (cy + oy) % n_cells) * n_cells + (cz + oz) % n_cells
+                for k in range(cell_start[c], cell_start[c + 1]):
+                    j = cell_particles[k]
+                    if j == i:
+                        continue
+                    dx = positions[j, 0] - positions[i, 0]
+                    dy = positions[j, 1] - positions[i, 1]
+                    dz = positions[j, 2] - positions[i, 2]
+                    dx -= np.rint(dx / box_size) * box_size
+                    dy -= np.rint(dy / box_size) * box_size
+                    dz -= np.rint(dz / box_size) * box_size
+                    if dx * dx + dy * dy + dz * dz < r_list_sq:
+                        if out.shape[0] > 0:
+                            out[offset + count] = j
+                        count += 1
+    return count
+
+@jit(nopython=True, parallel=True)
+def build_neighbor_list(positions, box_size, r_list):
+    """Build a full Verlet neighbour list in CSR form using cell lists.
+
+    Every pair appears twice (i -> j and j -> i) so that force kernels only ever
+    write to the row of the particle they own. Returns ``(neighbor_start,
+    neighbor_index)`` with the neighbours of ``i`` in
+    ``neighbor_index[neighbor_start[i]:neighbor_start[i + 1]]``.
+    """
+    num_particles = positions.shape[0]
+    n_cells = _cell_grid_size(box_size, r_list)
+    cell_start, cell_particles = build_cell_list(positions, box_size, n_cells)
+    r_list_sq = r_list * r_list
+    no_output = np.empty(0, dtype=np.int64)
+    counts = np.empty(num_particles, dtype=np.int64)
+    for i in prange(num_particles):
+        counts[i] = _scan_neighbors(i, positions, box_size, r_list_sq, n_cells,
+                                    cell_start, cell_particles, no_output, 0)
+    neighbor_start = np.zeros(num_particles + 1, dtype=np.int64)
+    neighbor_start[1:] = np.cumsum(counts)
+    neighbor_index = np.empty(neighbor_start[-1], dtype=np.int64)
+    for i in prange(num_particles):
+        _scan_neighbors(i, positions, box_size, r_list_sq, n_cells,
+                        cell_start, cell_particles, neighbor_index, neighbor_start[i])
+    return neighbor_start, neighbor_index
+
+@jit(nopython=True, parallel=True)
+def accumulate_forces_neighbor_list(positions, box_size, cutoff, neighbor_start, neighbor_index, forces):
+    """Overwrite ``forces`` with Lennard-Jones forces from a full neighbour list, one particle per thread."""
+    num_particles = positions.shape[0]
+    cutoff_sq = cutoff * cutoff
+    for i in prange(num_particles):
+        fx = 0.0
+        fy = 0.0
+        fz = 0.0
+        for k in range(neighbor_start[i], neighbor_start[i + 1]):
+            j = neighbor_index[k]
+            dx = positions[j, 0] - positions[i, 0]
+            dy = positions[j, 1] - positions[i, 1]
+            dz = positions[j, 2] - positions[i, 2]
+            dx -= np.rint(dx / box_size) * box_size
+            dy -= np.rint(dy / box_size) * box_size
+            dz -= np.rint(dz / box_size) * box_size
+            r_sq = dx * dx + dy * dy + dz * dz
+            if r_sq < cutoff_sq:
+                r = np.sqrt(r_sq)
+                scale = lennard_jones_potential(r) / r
+                fx += scale * dx
+                fy += scale * dy
+                fz += scale * dz
+        forces[i, 0] = fx
+        forces[i, 1] = fy
+        forces[i, 2] = fz
+
+@jit(nopython=True)
+def compute_forces_neighbor_list(positions, box_size, cutoff, neighbor_start, neighbor_index):
+    """Compute Lennard-Jones forces from a full neighbour list."""
+    forces = np.empty_like(positions)
+    accumulate_forces_neighbor_list(positions, box_size, cutoff, neighbor_start, neighbor_index, forces)
+    return forces
+
+@jit(nopython=True, parallel=True)
+def potential_energy_neighbor_list(positions, box_size, cutoff, neighbor_start, neighbor_index):
+    """Total Lennard-Jones energy from a full neighbour list (each pair counted once)."""
+    num_particles = positions.shape[0]
+    energies = np.zeros(num_particles)
+    cutoff_sq = cutoff * cutoff
+    for i in prange(num_particles):
+        total = 0.0
+        for k in range(neighbor_start[i], neighbor_start[i + 1]):
+            j = neighbor_index[k]
+            dx = positions[j, 0] - positions[i, 0]
+            dy = positions[j, 1] - positions[i, 1]
+            dz = positions[j, 2] - positions[i, 2]
+            dx -= np.rint(dx / box_size) * box_size
+            dy -= np.rint(dy / box_size) * box_size
+            dz -= np.rint(dz / box_size) * box_size
+            r_sq = dx * dx + dy * dy + dz * dz
+            if r_sq < cutoff_sq:
+                total += lennard_jones_potential(np.sqrt(r_sq))
+        energies[i] = total
+    return 0.5 * energies.sum()
+
+@jit(nopython=True, parallel=True)
+def max_displacement(positions, reference, box_size):
+    """Largest minimum-image displacement of any particle from its reference position."""
+    num_particles = positions.shape[0]
+    displacement_sq = np.empty(num_particles)
+    for i in prange(num_particles):
+        total = 0.0
+        for d in range(3):
+            delta = positions[i, d] - reference[i, d]
+            delta -= np.rint(delta / box_size) * box_size
+            total += delta * delta
+        displacement_sq[i] = total
+    return np.sqrt(displacement_sq.max()) if num_particles > 0 else 0.0
+
+# Serial builds of the per-particle kernels, for use inside per-replica parallel loops.
+_build_neighbor_list_serial = jit(nopython=True)(build_neighbor_list.py_func)
+_accumulate_forces_serial = jit(nopython=True)(accumulate_forces_neighbor_list.py_func)
+_potential_energy_serial = jit(nopython=True)(potential_energy_neighbor_list.py_func)
+_max_displacement_serial = jit(nopython=True)(max_displacement.py_func)
+
+def _make_velocity_verlet_block(parallel, build_neighbors, accumulate_forces, displacement):
+    """Compile the velocity-Verlet block kernel against a set of neighbour/force kernels."""
+
+    @jit(nopython=True, parallel=parallel)
+    def velocity_verlet_block(positions, velocities, forces, box_size, time_step, num_steps, temperature,
+                              cutoff, skin, neighbor_start, neighbor_index, reference, thermostat_tau=0.0):
+        """Advance ``num_steps`` velocity-Verlet steps in place with a fused thermostat.
+
+        ``forces`` must hold the forces for the incoming positions and is left holding
+        the forces for the outgoing ones. The Verlet list is rebuilt inside the kernel
+        whenever a particle leaves half the skin; the (possibly new) list is returned
+        together with the number of rebuilds. A ``thermostat_tau`` of zero rescales
+        to ``temperature`` every step, a positive one applies Berendsen coupling.
+        """
+        num_particles = positions.shape[0]
+        half_step = 0.5 * time_step
+        rebuilds = 0
+        for step in range(num_steps):
+            for i in prange(num_particles):
+                for d in range(3):
+                    velocities[i, d] += half_step * forces[i, d]
+                    x = positions[i, d] + time_step * velocities[i, d]
+                    positions[i, d] = x - np.floor(x / box_size) * box_size  # Periodic boundary conditions
+            if displacement(positions, reference, box_size) > 0.5 * skin:
+                neighbor_start, neighbor_index = build_neighbors(positions, box_size, cutoff + skin)
+                reference[:, :] = positions
+                rebuilds += 1
+            accumulate_forces(positions, box_size, cutoff, neighbor_start, neighbor_index, forces)
+            kinetic_energy = 0.0
+            for i in prange(num_particles):
+                for d in range(3):
+                    velocities[i, d] += half_step * forces[i, d]
+                    kinetic_energy += 0.5 * velocities[i, d]**2
+            current_temperature = (2 / 3) * (kinetic_energy / num_particles)
+            if current_temperature > 0:
+                ratio = temperature / current_temperature
+                if thermostat_tau > 0:
+                    ratio = 1 + (time_step / thermostat_tau) * (ratio - 1)
+                scaling_factor = np.sqrt(max(ratio, 0.0))
+                for i in prange(num_particles):
+                    for d in range(3):
+                        velocities[i, d] *= scaling_factor
+        return neighbor_start, neighbor_index, rebuilds
+
+    return velocity_verlet_block
+
+velocity_verlet_block = _make_velocity_verlet_block(
+    True, build_neighbor_list, accumulate_forces_neighbor_list, max_displacement)
+_velocity_verlet_block_serial = _make_velocity_verlet_block(
+    False, _build_neighbor_list_serial, _accumulate_forces_serial, _max_displacement_serial)
+
+@jit(nopython=True, parallel=True)
+def ensemble_verlet_block(positions, velocities, box_size, time_step, num_steps, temperatures,
+                          thermostat_taus, cutoff, skin):
+    """Advance every replica of stacked ``(R, N, 3)`` arrays by ``num_steps``, one replica per thread.
+
+    Each replica builds its own Verlet list and forces on entry and then runs the
+    serial velocity-Verlet kernel with its own temperature and thermostat coupling.
+    Returns the per-replica potential energy of the final configuration.
+    """
+    num_replicas = positions.shape[0]
+    potential_energies = np.empty(num_replicas)
+    for r in prange(num_replicas):
+        neighbor_start, neighbor_index = _build_neighbor_list_serial(positions[r], box_size, cutoff + skin)
+        reference = positions[r].copy()
+        forces = np.empty_like(positions[r])
+        _accumulate_forces_serial(positions[r], box_size, cutoff, neighbor_start, neighbor_index, forces)
+        neighbor_start, neighbor_index, _ = _velocity_verlet_block_serial(
+            positions[r], velocities[r], forces, box_size, time_step, num_steps, temperatures[r],
+            cutoff, skin, neighbor_start, neighbor_index, reference, thermostat_taus[r])
+        potential_energies[r] = _potential_energy_serial(positions[r], box_size, cutoff,
+                                                         neighbor_start, neighbor_index)
+    return potential_energies
+
+class ReplicaEnsemble:
+    """Run many independent replicas of a Lennard-Jones system as one batch.
+
+    Positions and velocities are stacked ``(R, N, 3)`` arrays advanced together by
+    :func:`ensemble_verlet_block`, with a temperature and thermostat coupling per
+    replica. With ``exchange_interval`` set, :meth:`run` performs parallel
+    tempering by attempting Metropolis temperature swaps between replicas that
+    are neighbours on the temperature ladder.
+    """
+
+    def __init__(self, num_replicas, num_particles, box_size, time_step, temperatures,
+                 thermostat_taus=0.0, cutoff=2.5, skin=0.3, seed=None):
+        self.num_replicas = num_replicas
+        self.num_particles = num_particles
+        self.box_size = box_size
+        self.time_step = time_step
+        self.cutoff = cutoff
+        self.skin = skin
+        self.rng = np.random.default_rng(seed)
+        self.temperatures = np.broadcast_to(np.asarray(temperatures, dtype=np.float64), (num_replicas,)).copy()
+        self.thermostat_taus = np.broadcast_to(np.asarray(thermostat_taus, dtype=np.float64), (num_replicas,)).copy()
+        self.positions = self.rng.random((num_replicas, num_particles, 3)) * box_size
+        self.velocities = (self.rng.standard_normal((num_replicas, num_particles, 3))
+                           * np.sqrt(self.temperatures)[:, None, None])
+        self.potential_energies = None
+        self.exchange_attempts = 0
+        self.exchange_accepts = 0
+        self._exchange_parity = 0
+
+    def advance(self, num_steps):
+        """Advance all replicas by ``num_steps`` in a single compiled call."""
+        self.potential_energies = ensemble_verlet_block(
+            self.positions, self.velocities, self.box_size, self.time_step, num_steps,
+            self.temperatures, self.thermostat_taus, self.cutoff, self.skin)
+        return self.potential_energies
+
+    def attempt_exchanges(self):
+        """Attempt temperature swaps between ladder neighbours (alternating even/odd pairs)."""
+        if self.potential_energies is None:
+            raise ValueError("Replicas must be advanced before exchanges can be attempted.")
+        ladder = np.argsort(self.temperatures, kind='stable')
+        accepted = 0
+        for k in range(self._exchange_parity, self.num_replicas - 1, 2):
+            i, j = ladder[k], ladder[k + 1]
+            beta_i, beta_j = 1 / self.temperatures[i], 1 / self.temperatures[j]
+            delta = (beta_i - beta_j) * (self.potential_energies[i] - self.potential_energies[j])
+            self.exchange_attempts += 1
+            if delta >= 0 or self.rng.random() < np.exp(delta):
+                t_i, t_j = self.temperatures[i], self.temperatures[j]
+                self.velocities[i] *= np.sqrt(t_j / t_i)
+                self.velocities[j] *= np.sqrt(t_i / t_j)
+                self.temperatures[i], self.temperatures[j] = t_j, t_i
+                self.thermostat_taus[[i, j]] = self.thermostat_taus[[j, i]]
+                accepted += 1
+        self.exchange_accepts += accepted
+        self._exchange_parity ^= 1
+        return accepted
+
+    def run(self, num_steps, exchange_interval=None):
+        """Advance the ensemble, attempting exchanges every ``exchange_interval`` steps."""
+        block = exchange_interval or num_steps
+        completed = 0
+        while completed < num_steps:
+            steps = min(block, num_steps - completed)
+            self.advance(steps)
+            completed += steps
+            if exchange_interval:
+                self.attempt_exchanges()
+        logging.info(f"Ensemble of {self.num_replicas} replicas advanced {num_steps} steps; "
+                     f"{self.exchange_accepts}/{self.exchange_attempts} exchanges accepted.")
+        return self.positions
+
+class TrajectoryWriter:
+    """Stream simulation frames to chunked, memory-mapped ``.npy`` files.
+
+    Frames are written every ``stride`` steps into ``positions_XXXXX.npy`` chunks
+    (plus optional ``velocities_XXXXX.npy`` and ``energies_XXXXX.npy``) so memory
+    use stays at one chunk regardless of run length.
+    """
+
+    CHUNK_BYTES = 64 * 1024**2
+
+    def __init__(self, directory, num_particles, stride=1, chunk_frames=None,
+                 save_velocities=False, save_energies=False):
+        if stride < 1:
+            raise ValueError("Stride must be a positive integer.")
+        self.directory = directory
+        self.num_particles = num_particles
+        self.stride = stride
+        frame_bytes = num_particles * 3 * np.dtype(np.float64).itemsize
+        self.chunk_frames = chunk_frames or max(1, self.CHUNK_BYTES // max(frame_bytes, 1))
+        self.fields = ['positions']
+        if save_velocities:
+            self.fields.append('velocities')
+        if save_energies:
+            self.fields.append('energies')
+        self.num_frames = 0
+        self.chunk_sizes = []
+        self._buffers = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _chunk_path(self, field, index):
+        return os.path.join(self.directory, f'{field}_{index:05d}.npy')
+
+    def _field_shape(self, field, frames):
+        return (frames, 2) if field == 'energies' else (frames, self.num_particles, 3)
+
+    def _open_chunk(self):
+        index = len(self.chunk_sizes)
+        self._buffers = {
+            field: np.lib.format.open_memmap(self._chunk_path(field, index), mode='w+', dtype=np.float64,
+                                             shape=self._field_shape(field, self.chunk_frames))
+            for field in self.fields
+        }
+        self.chunk_sizes.append(0)
+
+    def write(self, step, positions, velocities=None, energies=None):
+        """Write the frame for ``step`` if it falls on the stride. Returns True if written."""
+        if step % self.stride:
+            return False
+        if not self.chunk_sizes or self.chunk_sizes[-1] == self.chunk_frames:
+            self._flush()
+            self._open_chunk()
+        row = self.chunk_sizes[-1]
+        values = {'positions': positions, 'velocities': velocities, 'energies': energies}
+        for field in self.fields:
+            if values[field] is None:
+                raise ValueError(f"Trajectory was opened with {field} but none were given.")
+            self._buffers[field][row] = values[field]
+        self.chunk_sizes[-1] += 1
+        self.num_frames += 1
+        return True
+
+    def _flush(self):
+        for buffer in self._buffers.values():
+            buffer.flush()
+        self._buffers = {}
+
+    def close(self):
+        """Flush data, trim the last chunk to its used length and write the index."""
+        self._flush()
+        if self.chunk_sizes and self.chunk_sizes[-1] < self.chunk_frames:
+            index, used = len(self.chunk_sizes) - 1, self.chunk_sizes[-1]
+            for field in self.fields:
+                path = self._chunk_path(field, index)
+                source = np.load(path, mmap_mode='r')
+                trimmed = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=source.dtype,
+                                                    shape=self._field_shape(field, used))
+                trimmed[:] = source[:used]
+                trimmed.flush()
+                del source, trimmed
+                os.replace(path + '.tmp', path)
+        metadata = {
+            'num_particles': self.num_particles,
+            'stride': self.stride,
+            'num_frames': self.num_frames,
+            'chunk_sizes': self.chunk_sizes,
+            'fields': self.fields,
+        }
+        with open(os.path.join(self.directory, 'trajectory.json'), 'w') as f:
+            json.dump(metadata, f)
+        logging.info(f"Trajectory of {self.num_frames} frames written to {self.directory}.")
+        return TrajectoryReader(self.directory)
+
+class TrajectoryReader:
+    """Lazily read a trajectory written by :class:`TrajectoryWriter`."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'trajectory.json'), 'r') as f:
+            metadata = json.load(f)
+        self.num_particles = metadata['num_particles']
+        self.stride = metadata['stride']
+        self.num_frames = metadata['num_frames']
+        self.chunk_sizes = metadata['chunk_sizes']
+        self.fields = metadata['fields']
+
+    def __len__(self):
+        return self.num_frames
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            return self.read('positions', key)
+        particles = key[1] if len(key) > 1 else slice(None)
+        positions = self.read('positions', key[0], particles)
+        return positions[..., key[2]] if len(key) > 2 else positions
+
+    def iter_chunks(self, field='positions'):
+        """Yield the memory-mapped chunks of ``field`` in frame order."""
+        if field not in self.fields:
+            raise KeyError(f"Trajectory does not contain {field}.")
+        for index in range(len(self.chunk_sizes)):
+            yield np.load(os.path.join(self.directory, f'{field}_{index:05d}.npy'), mmap_mode='r')
+
+    def read(self, field='positions', frames=slice(None), particles=slice(None)):
+        """Materialise the selected frames (and particles) of ``field``."""
+        selected = np.arange(self.num_frames)[frames]
+        scalar = np.ndim(selected) == 0
+        selected = np.atleast_1d(selected)
+        offsets = np.concatenate(([0], np.cumsum(self.chunk_sizes)))
+        parts = []
+        for index, chunk in enumerate(self.iter_chunks(field)):
+            local = selected[(selected >= offsets[index]) & (selected < offsets[index + 1])] - offsets[index]
+            if not local.size:
+                continue
+            if field == 'energies':
+                parts.append(chunk[local])
+            elif isinstance(particles, slice) or np.ndim(particles) == 0:
+                # Basic indexing keeps a view of the memmap, so only the wanted particles are read
+                parts.append(chunk[:, particles][local])
+            else:
+                parts.append(chunk[np.ix_(local, np.asarray(particles))])
+        if not parts:
+            shape = (0, 2) if field == 'energies' else (0,) + np.empty((self.num_particles, 3))[particles].shape
+            return np.empty(shape)
+        data = np.concatenate(parts)
+        return data[0] if scalar else data
+
+    def export(self, filename):
+        """Concatenate the positions into a single ``.npy`` file one chunk at a time."""
+        output = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float64,
+                                           shape=(self.num_frames, self.num_particles, 3))
+        start = 0
+        for chunk in self.iter_chunks('positions'):
+            output[start:start + len(chunk)] = chunk
+            start += len(chunk)
+        output.flush()
+
 class MolecularDynamics:
-    def __init__(self, num_particles, box_size, time_step, num_steps, temperature):
+    def __init__(self, num_particles, box_size, time_step, num_steps, temperature,
+                 cutoff=2.5, skin=0.3, use_neighbor_list=True):
         self.num_particles = num_particles
         self.box_size = box_size
         self.time_step = time_step
@@ -18,30 +497,55 @@ class MolecularDynamics:
         self.positions = np.random.rand(num_particles, 3) * box_size
         self.velocities = np.random.randn(num_particles, 3) * np.sqrt(temperature)
         self.trajectory = []
+        self.cutoff = cutoff
+        self.skin = skin
+        self.use_neighbor_list = use_neighbor_list
+        self.neighbor_rebuilds = 0
+        self._neighbor_start = None
+        self._neighbor_index = None
+        self._neighbor_reference = None
+        self._verlet_forces = None
+        self._verlet_positions = None
 
-    @staticmethod
-    @jit(nopython=True, parallel=True)
-    def lennard_jones_potential(r):
-        """Calculate the Lennard-Jones potential."""
-        return 4 * ((1 / r)**12 - (1 / r)**6)
+    lennard_jones_potential = staticmethod(lennard_jones_potential)
 
     @staticmethod
     @jit(nopython=True, parallel=True)
-    def compute_forces(positions, box_size):
-        """Compute forces on particles based on Lennard-Jones potential."""
+    def compute_forces(positions, box_size, cutoff=2.5):
+        """Compute forces on particles by checking all pairs (reference O(N^2) kernel)."""
         num_particles = positions.shape[0]
         forces = np.zeros_like(positions)
         for i in prange(num_particles):
-            for j in range(i + 1, num_particles):
+            for j in range(num_particles):
+                if j == i:
+                    continue
                 r_vec = positions[j] - positions[i]
-                r_vec -= np.round(r_vec / box_size) * box_size  # Periodic boundary conditions
-                r = np.linalg.norm(r_vec)
-                if r < 2.5:  # Only consider interactions within a cutoff distance
-                    force_magnitude = MolecularDynamics.lennard_jones_potential(r)
+                r_vec -= np.rint(r_vec / box_size) * box_size  # Periodic boundary conditions
+                r = np.sqrt(np.sum(r_vec**2))
+                if r < cutoff:  # Only consider interactions within a cutoff distance
+                    force_magnitude = lennard_jones_potential(r)
                     forces[i] += force_magnitude * (r_vec / r)
-                    forces[j] -= force_magnitude * (r_vec / r)
         return forces
 
+    def update_neighbor_list(self, force=False):
+        """Rebuild the Verlet list once any particle has moved more than half the skin."""
+        if not force and self._neighbor_reference is not None:
+            if max_displacement(self.positions, self._neighbor_reference, self.box_size) <= 0.5 * self.skin:
+                return False
+        self._neighbor_start, self._neighbor_index = build_neighbor_list(
+            self.positions, self.box_size, self.cutoff + self.skin)
+        self._neighbor_reference = self.positions.copy()
+        self.neighbor_rebuilds += 1
+        return True
+
+    def current_forces(self):
+        """Compute forces for the current positions with the configured force engine."""
+        if not self.use_neighbor_list:
+            return self.compute_forces(self.positions, self.box_size, self.cutoff)
+        self.update_neighbor_list()
+        return compute_forces_neighbor_list(self.positions, self.box_size, self.cutoff,
+                                            self._neighbor_start, self._neighbor_index)
+
     def apply_thermostat(self):
         """Apply a simple velocity rescaling thermostat."""
         kinetic_energy = 0.5 * np.sum(self.velocities**2)
@@ -49,22 +553,93 @@ class MolecularDynamics:
         scaling_factor = np.sqrt(self.temperature / current_temperature)
         self.velocities *= scaling_factor
 
-    def simulate(self):
-        """Run the molecular dynamics simulation."""
-        for step in range(self.num_steps):
-            forces = self.compute_forces(self.positions, self.box_size)
-            self.velocities += forces * self.time_step
-            self.positions += self.velocities * self.time_step
-            self.positions %= self.box_size  # Apply periodic boundary conditions
-            self.apply_thermostat()  # Control temperature
-            self.trajectory.append(self.positions.copy())
+    def current_energies(self):
+        """Return the (kinetic, potential) energy of the current configuration."""
+        self.update_neighbor_list(force=not self.use_neighbor_list)
+        kinetic_energy = 0.5 * np.sum(self.velocities**2)
+        potential_energy = potential_energy_neighbor_list(self.positions, self.box_size, self.cutoff,
+                                                          self._neighbor_start, self._neighbor_index)
+        return np.array([kinetic_energy, potential_energy])
+
+    def advance(self, num_steps, integrator='euler'):
+        """Advance the system by ``num_steps`` without recording frames.
+
+        ``'euler'`` is the original Python-driven scheme. ``'verlet'`` runs the
+        whole block inside one compiled velocity-Verlet kernel with the
+        thermostat fused in, returning to Python only when the block is done.
+        Its forces and Verlet list are carried over between blocks and rebuilt
+        whenever ``positions`` was changed outside the kernel. With
+        ``use_neighbor_list=False`` the kernel is given every pair once and
+        never rebuilds, which matches :meth:`compute_forces`.
+        """
+        if integrator == 'euler':
+            for _ in range(num_steps):
+                forces = self.current_forces()
+                self.velocities += forces * self.time_step
+                self.positions += self.velocities * self.time_step
+                self.positions %= self.box_size  # Apply periodic boundary conditions
+                self.apply_thermostat()  # Control temperature
+            self._verlet_forces = None
+        elif integrator == 'verlet':
+            skin = self.skin if self.use_neighbor_list else np.inf
+            if self._verlet_forces is None or not np.array_equal(self.positions, self._verlet_positions):
+                self._neighbor_start, self._neighbor_index = build_neighbor_list(
+                    self.positions, self.box_size, self.cutoff + skin)
+                self._neighbor_reference = self.positions.copy()
+                self.neighbor_rebuilds += 1
+                self._verlet_forces = np.empty_like(self.positions)
+                accumulate_forces_neighbor_list(self.positions, self.box_size, self.cutoff,
+                                                self._neighbor_start, self._neighbor_index, self._verlet_forces)
+            self._neighbor_start, self._neighbor_index, rebuilds = velocity_verlet_block(
+                self.positions, self.velocities, self._verlet_forces, self.box_size, self.time_step,
+                num_steps, self.temperature, self.cutoff, skin,
+                self._neighbor_start, self._neighbor_index, self._neighbor_reference)
+            self.neighbor_rebuilds += rebuilds
+            self._verlet_positions = self.positions.copy()
+        else:
+            raise ValueError(f"Unknown integrator: {integrator}")
+
+    def simulate(self, output_dir=None, stride=1, save_velocities=False, save_energies=False, integrator='euler'):
+        """Run the molecular dynamics simulation.
+
+        Without ``output_dir`` every ``stride``-th frame is kept in memory and the
+        trajectory is returned as an array. With ``output_dir`` frames are streamed
+        to disk through a :class:`TrajectoryWriter` and a :class:`TrajectoryReader`
+        is returned instead. Steps between frames are advanced as one block, so
+        with ``integrator='verlet'`` Python is only re-entered once per frame.
+        """
+        writer = None
+        if output_dir is not None:
+            writer = TrajectoryWriter(output_dir, self.num_particles, stride=stride,
+                                      save_velocities=save_velocities, save_energies=save_energies)
+        self.trajectory = []
+        completed = 0
+        while completed < self.num_steps:
+            frame_step = -(-completed // stride) * stride  # Next step whose frame is recorded
+            target = min(frame_step + 1, self.num_steps)
+            self.advance(target - completed, integrator)
+            completed = target
+            if completed != frame_step + 1:
+                break
+            if writer is None:
+                self.trajectory.append(self.positions.copy())
+            else:
+                energies = self.current_energies() if save_energies else None
+                writer.write(frame_step, self.positions, self.velocities, energies)
+        if writer is not None:
+            self.trajectory = writer.close()
+            return self.trajectory
         return np.array(self.trajectory)
 
-    def plot_trajectory(self):
+    def plot_trajectory(self, particles=None):
         """Plot the trajectory of the particles."""
-        trajectory = np.array(self.trajectory)
-        for i in range(self.num_particles):
-            plt.plot(trajectory[:, i, 0], trajectory[:, i, 1], label=f'Particle {i}')
+        particles = range(self.num_particles) if particles is None else particles
+        for i in particles:
+            if isinstance(self.trajectory, TrajectoryReader):
+                path = self.trajectory.read(particles=i)
+            else:
+                path = np.array([frame[i] for frame in self.trajectory])
+            plt.plot(path[:, 0], path[:, 1], label=f'Particle {i}')
         plt.xlabel('X Position')
         plt.ylabel('Y Position')
         plt.title('Molecular Dynamics Simulation Trajectory')
@@ -73,7 +648,10 @@ class MolecularDynamics:
 
     def save_trajectory(self, filename='trajectory.npy'):
         """Save the trajectory data to a file."""
-        np.save(filename, self.trajectory)
+        if isinstance(self.trajectory, TrajectoryReader):
+            self.trajectory.export(filename)
+        else:
+            np.save(filename, self.trajectory)
         logging.info(f"Trajectory saved to {filename}.")
 
 # Example usage
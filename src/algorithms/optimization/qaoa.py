@@ -1,17 +1,96 @@
 # src/algorithms/optimization/qaoa.py
 
-from qiskit import Aer, QuantumCircuit, transpile, assemble, execute
+from qiskit import Aer, QuantumCircuit
+from qiskit.circuit import ParameterVector
 from qiskit.visualization import plot_histogram
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from scipy.optimize import minimize
+from quantum_backends.transpile_cache import cached_transpile
+from algorithms.optimization.qaoa_exact import ExactEvaluator, MAX_EXACT_QUBITS
+
+OPTIMIZATION_METHODS = ('random', 'gradient', 'spsa', 'cobyla')
+
+def _optimize_restart(qaoa, p, method, iterations, seed_sequence, exact, shots, options):
+    """Run one optimization restart; module level so process pools can pickle it."""
+    rng = np.random.default_rng(seed_sequence)
+    history = []
+    best = {'value': float('inf'), 'x': None, 'counts': None}
+
+    def evaluate(points):
+        points = np.atleast_2d(points)
+        values, counts = qaoa.objective(p, points[:, :p], points[:, p:], exact=exact, shots=shots,
+                                        seed=int(rng.integers(2 ** 31)), return_counts=True)
+        index = int(np.argmin(values))
+        if values[index] < best['value']:
+            best['value'], best['x'] = float(values[index]), points[index].copy()
+            best['counts'] = None if counts is None else counts[index]
+        return values
+
+    if method == 'random':
+        batch_size = options.get('batch_size', 100)
+        for start in range(0, iterations, batch_size):
+            values = evaluate(rng.random((min(batch_size, iterations - start), 2 * p)))
+            previous = history[-1] if history else np.inf
+            history.extend(np.minimum.accumulate(np.append(previous, values))[1:].tolist())
+    elif method == 'gradient':
+        # Central finite differences: the angles are shared by several gates,
+        # so the two-term parameter-shift rule does not apply directly.
+        learning_rate = options.get('learning_rate', 0.1)
+        step = options.get('step', 1e-3 if exact else 0.1)
+        x = rng.random(2 * p)
+        shifts = np.eye(2 * p) * step
+        for _ in range(iterations):
+            values = evaluate(np.vstack((x, x + shifts, x - shifts)))
+            history.append(best['value'])
+            x = x - learning_rate * (values[1:2 * p + 1] - values[2 * p + 1:]) / (2 * step)
+        evaluate(x)
+    elif method == 'spsa':
+        a, c = options.get('a', 0.2), options.get('c', 0.1)
+        stability = options.get('stability', 0.1 * iterations)
+        x = rng.random(2 * p)
+        for k in range(iterations):
+            a_k = a / (k + 1 + stability) ** 0.602
+            c_k = c / (k + 1) ** 0.101
+            delta = rng.choice((-1.0, 1.0), size=2 * p)
+            values = evaluate(np.vstack((x, x + c_k * delta, x - c_k * delta)))
+            history.append(best['value'])
+            x = x - a_k * (values[1] - values[2]) / (2 * c_k) * delta
+        evaluate(x)
+    else:  # 'cobyla'
+        def callback(x):
+            history.append(best['value'])
+        minimize(lambda x: evaluate(x)[0], rng.random(2 * p), method='COBYLA', callback=callback,
+                 options={'maxiter': iterations, 'rhobeg': options.get('rhobeg', 0.5)})
+    return best['value'], best['x'], best['counts'], history
 
 class QAOA:
     def __init__(self, num_qubits, cost_function):
         self.num_qubits = num_qubits
         self.cost_function = cost_function
         self.backend = Aer.get_backend('aer_simulator')
+        self._templates = {}
+        self.exact = ExactEvaluator(num_qubits, cost_function)
+        self.history = []
+        self.best_parameters = None
+
+    def __getstate__(self):
+        # Simulator handles and bound templates are rebuilt on demand after unpickling
+        state = self.__dict__.copy()
+        state.pop('backend', None)
+        state['_templates'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.backend = Aer.get_backend('aer_simulator')
 
     def create_circuit(self, p, gamma, beta):
-        """Create the QAOA circuit."""
+        """Create the QAOA circuit.
+
+        ``gamma`` and ``beta`` may hold numbers or symbolic ``Parameter`` objects.
+        """
         circuit = QuantumCircuit(self.num_qubits)
         circuit.h(range(self.num_qubits))  # Initialize in superposition
 
@@ -26,32 +105,112 @@ class QAOA:
             circuit.rx(2 * beta[i], range(self.num_qubits))
             circuit.barrier()
 
+        circuit.measure_all()
         return circuit
 
+    def template(self, p):
+        """Return the transpiled depth-``p`` circuit with symbolic angles.
+
+        The template is built and transpiled once per depth; runs only bind
+        values into it. Returns ``(circuit, gamma_parameters, beta_parameters)``.
+        """
+        if p not in self._templates:
+            gamma = ParameterVector('gamma', p)
+            beta = ParameterVector('beta', p)
+            circuit = cached_transpile(self.create_circuit(p, gamma, beta), self.backend)
+            self._templates[p] = (circuit, gamma, beta)
+        return self._templates[p]
+
+    def bind(self, p, gamma, beta):
+        """Bind one ``(gamma, beta)`` pair into the depth-``p`` template."""
+        circuit, gamma_parameters, beta_parameters = self.template(p)
+        values = dict(zip(gamma_parameters, gamma))
+        values.update(zip(beta_parameters, beta))
+        return circuit.assign_parameters(values)
+
+    def run_batch(self, p, gammas, betas, shots=1024, seed=None):
+        """Run many parameter sets in a single simulator job.
+
+        ``gammas`` and ``betas`` have shape ``(batch, p)``. The simulator binds
+        each row into the shared template, so nothing is rebuilt or re-transpiled.
+        Returns one counts dictionary per row; ``seed`` fixes the simulator's sampling.
+        """
+        gammas = np.atleast_2d(np.asarray(gammas, dtype=float))
+        betas = np.atleast_2d(np.asarray(betas, dtype=float))
+        circuit, gamma_parameters, beta_parameters = self.template(p)
+        binds = {parameter: gammas[:, i].tolist() for i, parameter in enumerate(gamma_parameters)}
+        binds.update({parameter: betas[:, i].tolist() for i, parameter in enumerate(beta_parameters)})
+        run_options = {} if seed is None else {'seed_simulator': seed}
+        result = self.backend.run(circuit, parameter_binds=[binds], shots=shots, **run_options).result()
+        return [result.get_counts(i) for i in range(len(gammas))]
+
     def run(self, p, gamma, beta):
         """Run the QAOA circuit and return the results."""
-        circuit = self.create_circuit(p, gamma, beta)
-        circuit = transpile(circuit, self.backend)
-        qobj = assemble(circuit)
-        result = execute(qobj, self.backend).result()
-        counts = result.get_counts(circuit)
-        return counts
-
-    def optimize(self, p, iterations=100):
-        """Optimize the parameters gamma and beta."""
-        best_counts = None
-        best_value = float('inf')
+        return self.run_batch(p, [gamma], [beta])[0]
 
-        for _ in range(iterations):
-            gamma = np.random.rand(p)
-            beta = np.random.rand(p)
-            counts = self.run(p, gamma, beta)
-            value = self.evaluate_counts(counts)
+    def cost_diagonal(self):
+        """Cost of every bitstring, indexed like the statevector; see :class:`ExactEvaluator`."""
+        return self.exact.cost_diagonal()
+
+    def statevectors(self, p, gammas, betas):
+        """Exact final states for a batch of angles; see :meth:`ExactEvaluator.statevectors`."""
+        return self.exact.statevectors(p, gammas, betas)
+
+    def expectation(self, p, gammas, betas):
+        """Exact expected cost for each row of angles; see :meth:`ExactEvaluator.expectation`."""
+        return self.exact.expectation(p, gammas, betas)
+
+    def probabilities(self, p, gamma, beta):
+        """Exact measurement distribution for one parameter set, keyed like counts."""
+        return self.exact.probabilities(p, gamma, beta)
+
+    def objective(self, p, gammas, betas, exact=False, shots=1024, seed=None, return_counts=False):
+        """Score each row of angles: exact expected cost, or ``evaluate_counts`` of a sampled run.
+
+        With ``return_counts`` the sampled counts the scores were computed from
+        are returned as well, as ``(values, counts)``; ``counts`` is None when
+        ``exact`` is set.
+        """
+        if exact:
+            values, counts = self.expectation(p, gammas, betas), None
+        else:
+            counts = self.run_batch(p, gammas, betas, shots, seed)
+            values = np.array([self.evaluate_counts(row) for row in counts], dtype=float)
+        return (values, counts) if return_counts else values
+
+    def optimize(self, p, iterations=100, method='random', restarts=1, seed=None, processes=1,
+                 exact=False, shots=1024, **options):
+        """Optimize the parameters gamma and beta.
+
+        ``method`` is one of ``'random'`` (batched random search), ``'gradient'``
+        (gradient descent on finite differences evaluated as one batch),
+        ``'spsa'`` or ``'cobyla'``. Every evaluation batch goes to the simulator
+        as a single job, or to the exact evaluator with ``exact=True``.
 
-            if value < best_value:
-                best_value = value
-                best_counts = counts
+        ``restarts`` independent starts are seeded from ``seed`` and run in up to
+        ``processes`` worker processes. The best-so-far value of each restart
+        per iteration is kept in ``self.history``, the winning angles in
+        ``self.best_parameters``. Returns the counts of the winning evaluation
+        (the exact distribution with ``exact=True``) and their value.
+        """
+        if method not in OPTIMIZATION_METHODS:
+            raise ValueError(f"Unknown optimization method '{method}', expected one of {OPTIMIZATION_METHODS}")
+        seeds = np.random.SeedSequence(seed).spawn(restarts)
+        jobs = [(self, p, method, iterations, child, exact, shots, options) for child in seeds]
+        if processes > 1 and restarts > 1:
+            # Spawned so that workers do not inherit the simulator's thread pool
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(processes, restarts), mp_context=context) as executor:
+                results = list(executor.map(_optimize_restart, *zip(*jobs)))
+        else:
+            results = [_optimize_restart(*job) for job in jobs]
 
+        self.history = [history for *_, history in results]
+        best_value, best_x, best_counts, _ = min(results, key=lambda result: result[0])
+        gamma, beta = best_x[:p], best_x[p:]
+        self.best_parameters = (gamma, beta)
+        if exact:
+            best_counts = self.probabilities(p, gamma, beta)
         return best_counts, best_value
 
     def evaluate_counts(self, counts):
@@ -0,0 +1,102 @@
+# src/algorithms/optimization/qaoa_exact.py
+
+import numpy as np
+
+# Largest register evaluated exactly; statevectors grow as 2**num_qubits
+MAX_EXACT_QUBITS = 20
+# Amplitudes held at once while evaluating a batch of angles
+EXACT_CHUNK_AMPLITUDES = 1 << 22
+
+class ExactEvaluator:
+    """Exact statevector evaluation of the QAOA circuit built by ``QAOA.create_circuit``.
+
+    The cost layer only applies ``rz`` rotations, so it is a diagonal phase,
+    and the mixer is an ``rx`` on every qubit; both are applied to a whole
+    batch of angles at once with NumPy. Kept free of Qiskit so the evaluator
+    can run (and be imported by worker processes) without a simulator.
+    """
+
+    def __init__(self, num_qubits, cost_function, chunk_amplitudes=EXACT_CHUNK_AMPLITUDES):
+        self.num_qubits = num_qubits
+        self.cost_function = cost_function
+        self.chunk_amplitudes = chunk_amplitudes
+        self._cost_diagonal = None
+        self._phase_generators = None
+
+    def _bits(self):
+        """Bit ``j`` of every basis index; qubit 0 is the least significant bit."""
+        if self.num_qubits > MAX_EXACT_QUBITS:
+            raise ValueError(f"Exact evaluation supports at most {MAX_EXACT_QUBITS} qubits, got {self.num_qubits}")
+        indices = np.arange(1 << self.num_qubits)
+        return (indices[:, None] >> np.arange(self.num_qubits)) & 1
+
+    def cost_diagonal(self):
+        """Cost ``x^T C x`` of every bitstring ``x``, indexed like the statevector.
+
+        Computed once per instance and reused by every expectation evaluation.
+        """
+        if self._cost_diagonal is None:
+            bits = self._bits().astype(float)
+            cost = np.asarray(self.cost_function, dtype=float)
+            self._cost_diagonal = np.einsum('ki,ij,kj->k', bits, cost, bits)
+        return self._cost_diagonal
+
+    def _phases(self, p):
+        """Per-layer sums of Z eigenvalues over the qubits the cost layer rotates."""
+        if self._phase_generators is None or len(self._phase_generators) < p:
+            signs = 1.0 - 2.0 * self._bits()
+            mask = np.asarray(self.cost_function)[:self.num_qubits, :p] == 1
+            self._phase_generators = (signs @ mask).T
+        return self._phase_generators[:p]
+
+    def statevectors(self, p, gammas, betas):
+        """Exact final states of the circuit for a batch of angles.
+
+        ``gammas`` and ``betas`` have shape ``(batch, p)``; the result has shape
+        ``(batch, 2**num_qubits)`` and follows Qiskit's little-endian ordering.
+        Measurements and barriers are ignored.
+        """
+        gammas = np.atleast_2d(np.asarray(gammas, dtype=float))
+        betas = np.atleast_2d(np.asarray(betas, dtype=float))
+        phases = self._phases(p)
+        n = self.num_qubits
+        dim = 1 << n
+        states = np.full((len(gammas), dim), dim ** -0.5, dtype=complex)
+        for i in range(p):
+            # rz(2 * gamma) on qubit j is exp(-1j * gamma * Z_j)
+            states *= np.exp(-1j * gammas[:, i, None] * phases[i])
+            cos = np.cos(betas[:, i]).reshape((-1,) + (1,) * n)
+            sin = -1j * np.sin(betas[:, i]).reshape((-1,) + (1,) * n)
+            tensor = states.reshape((-1,) + (2,) * n)
+            for qubit in range(n):
+                axis = n - qubit
+                zero = np.take(tensor, 0, axis=axis)
+                one = np.take(tensor, 1, axis=axis)
+                squeezed_cos, squeezed_sin = cos.squeeze(axis), sin.squeeze(axis)
+                tensor = np.stack((squeezed_cos * zero + squeezed_sin * one,
+                                   squeezed_sin * zero + squeezed_cos * one), axis=axis)
+            states = tensor.reshape(-1, dim)
+        return states
+
+    def expectation(self, p, gammas, betas):
+        """Exact expected cost for each row of ``gammas`` and ``betas``.
+
+        Evaluates the cost diagonal against statevector probabilities, in chunks
+        of at most ``chunk_amplitudes`` amplitudes so that large angle grids stay
+        within a fixed amount of memory.
+        """
+        gammas = np.atleast_2d(np.asarray(gammas, dtype=float))
+        betas = np.atleast_2d(np.asarray(betas, dtype=float))
+        diagonal = self.cost_diagonal()
+        chunk = max(1, self.chunk_amplitudes // diagonal.size)
+        values = np.empty(len(gammas))
+        for start in range(0, len(gammas), chunk):
+            states = self.statevectors(p, gammas[start:start + chunk], betas[start:start + chunk])
+            values[start:start + chunk] = (np.abs(states) ** 2) @ diagonal
+        return values
+
+    def probabilities(self, p, gamma, beta):
+        """Exact measurement distribution for one parameter set, keyed like counts."""
+        probabilities = np.abs(self.statevectors(p, [gamma], [beta])[0]) ** 2
+        return {format(index, f'0{self.num_qubits}b'): probability
+                for index, probability in enumerate(probabilities) if probability > 1e-12}
@@ -1,41 +1,25 @@
 # src/main.py
 
-import sqlite3  # Example for database connection
-import multiprocessing as mp
-from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
+from utils.ingest_pipeline import IngestPipeline
 from utils.visualization import DataVisualizer
 
-def load_data(loader):
-    """Load data using the provided DataLoader instance."""
-    data = loader.load_csv()
-    if data is None:
-        print("Failed to load data.")
-    return data
-
 def main():
-    # Initialize DataLoader with a CSV file path or database connection
-    csv_file_path = 'data/quantum_data.csv'  # Example CSV file path
-    loader = DataLoader(file_path=csv_file_path)
-
-    # Load data in parallel
-    with mp.Pool(processes=2) as pool:
-        data = pool.apply(load_data, (loader,))
-
-    if data is None:
+    # Shard the input CSV files across worker processes; each shard is loaded,
+    # filtered (example: value > 0.5) and has its features extracted in a worker.
+    # Files seen before are memory-mapped from the columnar cache instead of re-parsed.
+    csv_file_paths = ['data/quantum_data.csv']  # Example CSV file paths
+    pipeline = IngestPipeline(csv_file_paths, condition='value > 0.5', feature_columns=['feature1', 'feature2'],
+                              cache_dir='data/.cache', filter_columns=['feature1', 'feature2'])
+    try:
+        results = pipeline.run()
+    except Exception as e:
+        print(f"Failed to load data: {e}")
         return
 
-    # Initialize DataProcessor with the loaded data
-    processor = DataProcessor(data)
-
-    # Normalize the data
-    normalized_data = processor.normalize()
-
-    # Filter the data based on a condition (example: value > 0.5)
-    filtered_data = processor.filter_data('value > 0.5')
-
-    # Extract specific features (example: ['feature1', 'feature2'])
-    features = processor.extract_features(['feature1', 'feature2'])
+    # Normalized with statistics merged from every shard
+    normalized_data = results['normalized']
+    filtered_data = results['filtered']
+    features = results['features']
 
     # Initialize DataVisualizer
     visualizer = DataVisualizer()
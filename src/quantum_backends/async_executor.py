@@ -0,0 +1,96 @@
+# quantum_backends/async_executor.py
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+def is_local_simulator(backend):
+    """Whether ``backend`` simulates in this process rather than queueing remote jobs.
+
+    Backends without a provider handle (NumPy, Cirq, PennyLane) always are; a
+    Qiskit backend is asked through its configuration.
+    """
+    native = getattr(backend, 'backend', None)
+    if native is None or not hasattr(native, 'configuration'):
+        return True
+    configuration = native.configuration()
+    return bool(getattr(configuration, 'simulator', False) and getattr(configuration, 'local', True))
+
+class AsyncExecutor:
+    """Non-blocking circuit execution for any :class:`QuantumBackend`.
+
+    ``submit`` returns an ``asyncio.Task`` resolving to the circuit's counts, so
+    callers can build, transpile and post-process other circuits while jobs
+    run. At most ``max_in_flight`` jobs run at once; further submissions wait
+    for a free slot. Tasks can be cancelled and time out ``timeout`` seconds
+    after submission, time spent waiting for a slot included.
+
+    Local simulators run on a thread pool (the simulators release the GIL
+    while they work). Remote backends are submitted through
+    ``backend.submit_job`` and polled every ``poll_interval`` seconds; a
+    cancelled or timed-out task cancels its remote job. A local simulation that
+    has already started cannot be interrupted, so it finishes in the background
+    and its result is discarded.
+    """
+
+    def __init__(self, backend, max_in_flight=4, timeout=None, poll_interval=1.0):
+        self.backend = backend
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.local = is_local_simulator(backend)
+        self.in_flight = 0
+        self._window = asyncio.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='quantum-job')
+
+    def submit(self, circuit, shots=None, timeout=None):
+        """Schedule ``circuit`` and return a task resolving to its counts.
+
+        Must be called while an event loop is running. ``timeout`` overrides the
+        executor-wide default for this job.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        return asyncio.ensure_future(self._execute(circuit, shots, timeout))
+
+    async def map(self, circuits, shots=None, timeout=None):
+        """Submit every circuit and return their counts in order."""
+        return await asyncio.gather(*(self.submit(circuit, shots, timeout) for circuit in circuits))
+
+    async def _execute(self, circuit, shots, timeout):
+        # The timeout covers the wait for a slot as well as the run itself
+        return await asyncio.wait_for(self._in_window(circuit, shots), timeout)
+
+    async def _in_window(self, circuit, shots):
+        async with self._window:
+            self.in_flight += 1
+            try:
+                return await self._run(circuit, shots)
+            finally:
+                self.in_flight -= 1
+
+    async def _run(self, circuit, shots):
+        loop = asyncio.get_running_loop()
+        if self.local:
+            return await loop.run_in_executor(self._executor, self.backend.run, circuit, shots)
+        job = await loop.run_in_executor(self._executor, self.backend.submit_job, circuit, shots)
+        try:
+            while not job.in_final_state():
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            logging.info(f"Cancelling job {job.job_id()}")
+            job.cancel()
+            raise
+        return await loop.run_in_executor(self._executor, self.backend.job_counts, job)
+
+    def close(self):
+        """Stop accepting work and drop jobs that have not started yet."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,21 @@
+# quantum_backends/base.py
+
+from abc import ABC, abstractmethod
+
+class QuantumBackend(ABC):
+    """Interface shared by every quantum backend.
+
+    ``run_batch`` submits several circuits in one native call and returns one
+    counts dict per circuit. Counts map bitstrings to integer frequencies, with
+    qubit (or wire) 0 as the rightmost character, as in Qiskit.
+    """
+
+    default_shots = 1024
+
+    @abstractmethod
+    def run_batch(self, circuits, shots=None):
+        """Execute ``circuits`` together and return their counts in order."""
+
+    def run(self, circuit, shots=None):
+        """Execute a single circuit and return its counts."""
+        return self.run_batch([circuit], shots)[0]
@@ -1,36 +1,125 @@
 # quantum_backends/cirq_backend.py
 
 import cirq
+import time
+import logging
 import numpy as np
 import matplotlib.pyplot as plt
+from quantum_backends.base import QuantumBackend
+from quantum_backends.shot_engine import ShotEngine
+from quantum_backends.counts import Counts
 
-class CirqBackend:
- def __init__(self, num_qubits, noise_model=None):
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+class CirqBackend(QuantumBackend):
+    def __init__(self, num_qubits, noise_model=None, measurement_key='z'):
         self.num_qubits = num_qubits
         self.noise_model = noise_model
+        self.measurement_key = measurement_key
         self.simulator = cirq.Simulator(noise=self.noise_model)
+        self.shot_engine = ShotEngine()
 
     def create_circuit(self, gate_error=0.01, readout_error=0.05):
         """Create a simple quantum circuit with noise models."""
         circuit = cirq.Circuit()
         qubits = [cirq.GridQubit(0, i) for i in range(self.num_qubits)]
         circuit.append(cirq.H.on_each(*qubits))  # Apply Hadamard gates
-        circuit.append(cirq.measure(*qubits, key='z'))  # Measure all qubits
+        circuit.append(cirq.measure(*qubits, key=self.measurement_key))  # Measure all qubits
         return circuit
 
-    def execute_circuit(self, circuit):
-        """Execute the quantum circuit with noise models and return results."""
+    def _terminal_measurement(self, circuit):
+        """Return the single terminal measurement of an ideal unitary circuit, else ``None``."""
+        if self.noise_model is not None or cirq.is_parameterized(circuit):
+            return None
+        measurements = [operation for _, operation in circuit.findall_operations(cirq.is_measurement)]
+        if (len(measurements) != 1 or not circuit.are_all_measurements_terminal()
+                or cirq.measurement_key_name(measurements[0]) != self.measurement_key):
+            return None
+        gate = measurements[0].gate
+        if any(gate.full_invert_mask()) or gate.confusion_map:
+            return None
+        if not all(cirq.has_unitary(operation) for operation in circuit.all_operations()
+                   if not cirq.is_measurement(operation)):
+            return None
+        return measurements[0]
+
+    def _measured_distribution(self, circuit, measurement):
+        """Probabilities of the measurement's outcomes, first measured qubit most significant."""
+        unitary_part = cirq.Circuit(operation for operation in circuit.all_operations()
+                                    if not cirq.is_measurement(operation))
+        measured = list(measurement.qubits)
+        others = sorted(set(circuit.all_qubits()) - set(measured))
+        state = cirq.Simulator(dtype=np.complex128).simulate(unitary_part, qubit_order=measured + others)
+        probabilities = np.abs(state.final_state_vector) ** 2
+        return probabilities.reshape(1 << len(measured), -1).sum(axis=1)
+
+    def sample_counts(self, circuit, shots=None, method='multinomial'):
+        """Draw outcome counts from the cached distribution of a terminal-measurement circuit.
+
+        Returns a dense array indexed like ``result.histogram`` keys, or ``None``
+        if the circuit has to be simulated shot by shot.
+        """
+        measurement = self._terminal_measurement(circuit)
+        if measurement is None:
+            return None
+        return self.shot_engine.counts(circuit.freeze(), lambda: self._measured_distribution(circuit, measurement),
+                                       shots or self.default_shots, method=method)
+
+    @staticmethod
+    def _sampled_counts(samples):
+        width = samples.size.bit_length() - 1
+        # Reverse the bits so that the first measured qubit is bit 0, as in _measured_counts
+        return Counts.from_array(samples, width).marginal(range(width - 1, -1, -1))
+
+    def _measured_counts(self, result):
+        measurements = result.measurements[self.measurement_key]
+        width = measurements.shape[1]
+        # Cirq lists the first measured qubit first; weight it as bit 0 instead.
+        return Counts.from_samples(measurements.astype(np.int64) @ (1 << np.arange(width)), width)
+
+    def execute_circuit(self, circuit, shots=None):
+        """Execute the quantum circuit with noise models and return its :class:`Counts`.
+
+        Bit ``k`` of every outcome is the ``k``-th measured qubit, as in :meth:`run_batch`.
+        """
         start_time = time.time()
-        result = self.simulator.run(circuit, repetitions=1024)
+        samples = self.sample_counts(circuit, shots)
+        if samples is not None:
+            counts = self._sampled_counts(samples)
+        else:
+            counts = self._measured_counts(self.simulator.run(circuit, repetitions=shots or self.default_shots))
         end_time = time.time()
 
-        counts = result.histogram(key='z')
         logging.info(f"Execution Time: {end_time - start_time:.6f} seconds")
         return counts
 
+    def run_batch(self, circuits, shots=None):
+        """Execute all circuits with one ``Simulator.run_batch`` call and return their counts.
+
+        Circuits the shot engine can sample are left out of the simulator call.
+        """
+        circuits = list(circuits)
+        shots = shots or self.default_shots
+        start_time = time.time()
+        batch_counts = [None] * len(circuits)
+        for index, circuit in enumerate(circuits):
+            samples = self.sample_counts(circuit, shots)
+            if samples is not None:
+                batch_counts[index] = self._sampled_counts(samples)
+        pending = [index for index, counts in enumerate(batch_counts) if counts is None]
+        if pending:
+            results = self.simulator.run_batch([circuits[index] for index in pending], repetitions=shots)
+            for index, (result,) in zip(pending, results):
+                batch_counts[index] = self._measured_counts(result)
+        end_time = time.time()
+
+        logging.info(f"Batch Execution Time: {end_time - start_time:.6f} seconds for {len(batch_counts)} circuits")
+        return batch_counts
+
     def visualize_results(self, counts):
         """Visualize the results of the quantum circuit."""
-        plt.bar(range(2**self.num_qubits), counts)
+        plt.bar(list(counts.keys()), list(counts.values()))
         plt.xlabel('Outcome')
         plt.ylabel('Frequency')
         plt.show()
@@ -0,0 +1,160 @@
+# quantum_backends/counts.py
+
+from collections.abc import Mapping
+import numpy as np
+
+# Registers up to this width keep a dense count per outcome when at least
+# DENSE_MIN_FILL of all outcomes occurred; otherwise only the outcomes that
+# occurred are stored
+DENSE_MAX_BITS = 16
+DENSE_MIN_FILL = 0.125
+
+class Counts(Mapping):
+    """Measurement counts backed by integer outcome indices and a NumPy count array.
+
+    Outcome ``i`` is the basis state whose bit ``q`` is qubit ``q``, so its
+    bitstring prints with qubit 0 rightmost as in Qiskit. The object reads like
+    a ``{bitstring: count}`` dict, but bitstrings are only produced when asked
+    for; marginals, merges and expectations work on the arrays directly.
+    """
+
+    def __init__(self, outcomes, frequencies, num_bits):
+        if num_bits > 63:
+            raise ValueError(f"Counts supports at most 63 bits, got {num_bits}")
+        outcomes = np.asarray(outcomes, dtype=np.int64)
+        frequencies = np.asarray(frequencies, dtype=np.int64)
+        self.num_bits = num_bits
+        self._dict = None
+        self._dense = None
+        self._outcomes, inverse = np.unique(outcomes, return_inverse=True)
+        self._frequencies = np.bincount(inverse.ravel(), weights=frequencies,
+                                        minlength=self._outcomes.size).astype(np.int64)
+        keep = self._frequencies > 0
+        self._outcomes, self._frequencies = self._outcomes[keep], self._frequencies[keep]
+        if num_bits <= DENSE_MAX_BITS and self._outcomes.size >= DENSE_MIN_FILL * (1 << num_bits):
+            self._dense = np.zeros(1 << num_bits, dtype=np.int64)
+            self._dense[self._outcomes] = self._frequencies
+            self._outcomes = self._frequencies = None
+
+    @classmethod
+    def from_array(cls, counts, num_bits=None):
+        """Build from a dense array with one count per outcome index."""
+        counts = np.asarray(counts)
+        num_bits = counts.size.bit_length() - 1 if num_bits is None else num_bits
+        outcomes = np.flatnonzero(counts)
+        return cls(outcomes, counts[outcomes], num_bits)
+
+    @classmethod
+    def from_samples(cls, samples, num_bits):
+        """Build from the outcome index of every individual shot."""
+        outcomes, frequencies = np.unique(np.asarray(samples, dtype=np.int64), return_counts=True)
+        return cls(outcomes, frequencies, num_bits)
+
+    @classmethod
+    def from_dict(cls, counts, num_bits=None):
+        """Build from a ``{bitstring or int: count}`` mapping such as ``result.get_counts()``.
+
+        Spaces between classical registers are dropped.
+        """
+        if isinstance(counts, Counts):
+            return counts
+        keys = [key.replace(' ', '') if isinstance(key, str) else key for key in counts]
+        if num_bits is None:
+            num_bits = max((len(key) for key in keys if isinstance(key, str)), default=0)
+            num_bits = max([num_bits] + [int(key).bit_length() for key in keys if not isinstance(key, str)])
+        outcomes = [int(key, 2) if isinstance(key, str) else int(key) for key in keys]
+        return cls(outcomes, list(counts.values()), num_bits)
+
+    @property
+    def outcomes(self):
+        """Indices of the outcomes that occurred, in increasing order."""
+        return np.flatnonzero(self._dense) if self._dense is not None else self._outcomes
+
+    @property
+    def frequencies(self):
+        """Counts of :attr:`outcomes`, aligned with them."""
+        return self._dense[self._dense > 0] if self._dense is not None else self._frequencies
+
+    @property
+    def shots(self):
+        """Total number of shots."""
+        return int(self.frequencies.sum())
+
+    def to_array(self):
+        """Return the dense count array of length ``2**num_bits``."""
+        if self._dense is not None:
+            return self._dense.copy()
+        dense = np.zeros(1 << self.num_bits, dtype=np.int64)
+        dense[self._outcomes] = self._frequencies
+        return dense
+
+    def to_dict(self):
+        """Return the counts as a plain ``{bitstring: count}`` dict."""
+        if self._dict is None:
+            self._dict = {format(outcome, f'0{self.num_bits}b'): int(frequency)
+                          for outcome, frequency in zip(self.outcomes, self.frequencies)}
+        return self._dict
+
+    def int_outcomes(self):
+        """Return the counts as a ``{outcome index: count}`` dict."""
+        return {int(outcome): int(frequency) for outcome, frequency in zip(self.outcomes, self.frequencies)}
+
+    def __getitem__(self, key):
+        outcome = int(key.replace(' ', ''), 2) if isinstance(key, str) else int(key)
+        if self._dense is not None:
+            if 0 <= outcome < self._dense.size and self._dense[outcome]:
+                return int(self._dense[outcome])
+        else:
+            position = np.searchsorted(self._outcomes, outcome)
+            if position < self._outcomes.size and self._outcomes[position] == outcome:
+                return int(self._frequencies[position])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self):
+        return int(self.outcomes.size)
+
+    def __repr__(self):
+        return f"Counts({self.to_dict()!r})"
+
+    def marginal(self, bits):
+        """Counts over the given bit positions; bit ``k`` of the result is ``bits[k]``."""
+        outcomes = np.zeros(self.outcomes.size, dtype=np.int64)
+        for position, bit in enumerate(bits):
+            outcomes |= ((self.outcomes >> bit) & 1) << position
+        return Counts(outcomes, self.frequencies, len(bits))
+
+    def merge(self, other):
+        """Return the combined counts of two runs over the same register."""
+        other = Counts.from_dict(other, self.num_bits)
+        if other.num_bits != self.num_bits:
+            raise ValueError(f"Cannot merge counts over {self.num_bits} and {other.num_bits} bits")
+        return Counts(np.concatenate((self.outcomes, other.outcomes)),
+                      np.concatenate((self.frequencies, other.frequencies)), self.num_bits)
+
+    __add__ = merge
+
+    def top_k(self, k):
+        """Return the ``k`` most frequent ``(bitstring, count)`` pairs, most frequent first."""
+        outcomes, frequencies = self.outcomes, self.frequencies
+        k = min(k, outcomes.size)
+        selected = np.argpartition(-frequencies, k - 1)[:k] if k else np.array([], dtype=np.int64)
+        selected = selected[np.lexsort((outcomes[selected], -frequencies[selected]))]
+        return [(format(outcomes[i], f'0{self.num_bits}b'), int(frequencies[i])) for i in selected]
+
+    def most_frequent(self):
+        """Index of the most frequent outcome (the lowest index on ties)."""
+        if not len(self):
+            raise ValueError("No counts recorded")
+        return int(self.outcomes[np.argmax(self.frequencies)])
+
+    def expectation(self, diagonal):
+        """Expectation of a diagonal observable.
+
+        ``diagonal`` is either an array of ``2**num_bits`` eigenvalues indexed by
+        outcome, or a function mapping an array of outcome indices to values.
+        """
+        values = diagonal(self.outcomes) if callable(diagonal) else np.asarray(diagonal)[self.outcomes]
+        return float(np.dot(values, self.frequencies) / self.shots)
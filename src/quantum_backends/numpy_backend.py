@@ -0,0 +1,265 @@
+# quantum_backends/numpy_backend.py
+
+import time
+import hashlib
+import logging
+import numpy as np
+import matplotlib.pyplot as plt
+from quantum_backends.base import QuantumBackend
+from quantum_backends.shot_engine import ShotEngine
+from quantum_backends.counts import Counts
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+_SQRT_HALF = 1 / np.sqrt(2)
+
+def _rx(theta):
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[c, -1j * s], [-1j * s, c]])
+
+def _ry(theta):
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.array([[c, -s], [s, c]], dtype=complex)
+
+def _rz(theta):
+    return np.diag([np.exp(-0.5j * theta), np.exp(0.5j * theta)])
+
+GATES = {
+    'h': np.array([[1, 1], [1, -1]], dtype=complex) * _SQRT_HALF,
+    'x': np.array([[0, 1], [1, 0]], dtype=complex),
+    'y': np.array([[0, -1j], [1j, 0]]),
+    'z': np.diag([1, -1]).astype(complex),
+    's': np.diag([1, 1j]),
+    'sdg': np.diag([1, -1j]),
+    't': np.diag([1, np.exp(0.25j * np.pi)]),
+    'tdg': np.diag([1, np.exp(-0.25j * np.pi)]),
+}
+
+class NumpyCircuit:
+    """Minimal gate list for :class:`NumpyBackend`, with a Qiskit-like builder API.
+
+    Qubit ``q`` is bit ``q`` of a basis-state index, so bitstrings print with
+    qubit 0 rightmost as in Qiskit.
+    """
+
+    def __init__(self, num_qubits):
+        self.num_qubits = num_qubits
+        self.operations = []
+        self.measured = False
+
+    @staticmethod
+    def _qubits(qubits):
+        return [qubits] if np.isscalar(qubits) else list(qubits)
+
+    def unitary(self, matrix, qubits):
+        """Apply a 2x2 ``matrix`` to each of ``qubits``."""
+        matrix = np.asarray(matrix, dtype=complex)
+        for qubit in self._qubits(qubits):
+            self.operations.append(('u', (int(qubit),), matrix))
+        return self
+
+    def h(self, qubits):
+        return self.unitary(GATES['h'], qubits)
+
+    def x(self, qubits):
+        return self.unitary(GATES['x'], qubits)
+
+    def y(self, qubits):
+        return self.unitary(GATES['y'], qubits)
+
+    def z(self, qubits):
+        return self.unitary(GATES['z'], qubits)
+
+    def s(self, qubits):
+        return self.unitary(GATES['s'], qubits)
+
+    def t(self, qubits):
+        return self.unitary(GATES['t'], qubits)
+
+    def rx(self, theta, qubits):
+        return self.unitary(_rx(theta), qubits)
+
+    def ry(self, theta, qubits):
+        return self.unitary(_ry(theta), qubits)
+
+    def rz(self, theta, qubits):
+        return self.unitary(_rz(theta), qubits)
+
+    def controlled(self, matrix, control, target):
+        """Apply a 2x2 ``matrix`` to ``target`` when ``control`` is 1."""
+        if control == target:
+            raise ValueError("Control and target must be different qubits.")
+        self.operations.append(('cu', (int(control), int(target)), np.asarray(matrix, dtype=complex)))
+        return self
+
+    def cx(self, control, target):
+        return self.controlled(GATES['x'], control, target)
+
+    def cz(self, control, target):
+        return self.controlled(GATES['z'], control, target)
+
+    def swap(self, qubit1, qubit2):
+        self.operations.append(('swap', (int(qubit1), int(qubit2)), None))
+        return self
+
+    def measure_all(self):
+        """Measure every qubit at the end of the circuit."""
+        self.measured = True
+        return self
+
+    def fingerprint(self):
+        """Hash of the gate list, equal for circuits built from the same gates."""
+        digest = hashlib.sha256(str(self.num_qubits).encode())
+        for kind, qubits, matrix in self.operations:
+            digest.update(f"{kind}{qubits}".encode())
+            if matrix is not None:
+                digest.update(np.ascontiguousarray(matrix).tobytes())
+        return digest.hexdigest()
+
+def _layer_blocks(layer, block_width):
+    """Combine single-qubit gates on distinct qubits into Kronecker blocks.
+
+    Qubits are grouped into aligned windows of ``block_width`` so a layer such
+    as an H on every qubit costs one pass per window instead of one per qubit.
+    """
+    windows = {}
+    for qubit, matrix in layer.items():
+        windows.setdefault(qubit // block_width, {})[qubit] = matrix
+    blocks = []
+    for window, gates in sorted(windows.items()):
+        if len(gates) == 1:
+            (qubit, matrix), = gates.items()
+            blocks.append(('u', (qubit,), matrix))
+            continue
+        low, high = min(gates), max(gates)
+        block = np.ones((1, 1), dtype=complex)
+        for qubit in range(low, high + 1):
+            block = np.kron(gates.get(qubit, np.eye(2)), block)
+        blocks.append(('block', (low, high - low + 1), block))
+    return blocks
+
+def fuse_operations(operations, block_width=4):
+    """Fuse single-qubit gates before simulation.
+
+    Runs of gates on the same qubit are multiplied into one 2x2 matrix, which
+    is flushed just before a two-qubit gate touches that qubit. Gates flushed
+    together act on distinct qubits and are merged further by
+    :func:`_layer_blocks`. The fused list is equivalent to the original.
+    """
+    fused, pending = [], {}
+    for kind, qubits, matrix in operations:
+        if kind == 'u':
+            qubit = qubits[0]
+            pending[qubit] = matrix @ pending[qubit] if qubit in pending else matrix
+            continue
+        flushed = {qubit: pending.pop(qubit) for qubit in qubits if qubit in pending}
+        fused.extend(_layer_blocks(flushed, block_width))
+        fused.append((kind, qubits, matrix))
+    fused.extend(_layer_blocks(pending, block_width))
+    return fused
+
+def _apply_on_axis(view, axis, matrix):
+    """Apply ``matrix`` in place along a length-2 ``axis`` of ``view``."""
+    zero = (slice(None),) * axis + (0,)
+    one = (slice(None),) * axis + (1,)
+    if matrix[0, 1] == 0 and matrix[1, 0] == 0:
+        view[zero] *= matrix[0, 0]
+        view[one] *= matrix[1, 1]
+        return
+    amplitude_zero = view[zero].copy()
+    view[zero] *= matrix[0, 0]
+    view[zero] += matrix[0, 1] * view[one]
+    view[one] *= matrix[1, 1]
+    view[one] += matrix[1, 0] * amplitude_zero
+
+def apply_operations(state, num_qubits, operations):
+    """Apply a gate list to a statevector in place and return it."""
+    tensor = state.reshape((2,) * num_qubits)  # Axis k holds qubit num_qubits - 1 - k
+    for kind, qubits, matrix in operations:
+        if kind == 'u':
+            qubit = qubits[0]
+            _apply_on_axis(state.reshape(2**(num_qubits - qubit - 1), 2, 2**qubit), 1, matrix)
+        elif kind == 'block':
+            low, width = qubits
+            view = state.reshape(2**(num_qubits - low - width), 2**width, 2**low)
+            view[...] = np.matmul(matrix, view)
+        elif kind == 'cu':
+            control_axis, target_axis = (num_qubits - 1 - q for q in qubits)
+            view = tensor[(slice(None),) * control_axis + (1,)]
+            _apply_on_axis(view, target_axis - (target_axis > control_axis), matrix)
+        elif kind == 'swap':
+            first, second = sorted(num_qubits - 1 - q for q in qubits)
+            index_01 = (slice(None),) * first + (0,) + (slice(None),) * (second - first - 1) + (1,)
+            index_10 = (slice(None),) * first + (1,) + (slice(None),) * (second - first - 1) + (0,)
+            swapped = tensor[index_01].copy()
+            tensor[index_01] = tensor[index_10]
+            tensor[index_10] = swapped
+    return state
+
+class NumpyBackend(QuantumBackend):
+    """Dependency-free statevector simulator for small circuits.
+
+    Gates are applied in place as reshaped tensor updates on a NumPy
+    statevector, with single-qubit runs fused first. Results are exact
+    probabilities or counts sampled from them, in the same bitstring format as
+    :class:`QiskitBackend`. Distributions are cached by the shot engine, so
+    repeated runs of the same circuit only pay for sampling.
+    """
+
+    def __init__(self, num_qubits, shots=1024, seed=None, sampling='multinomial'):
+        self.num_qubits = num_qubits
+        self.shots = shots
+        self.sampling = sampling
+        self.rng = np.random.default_rng(seed)
+        self.shot_engine = ShotEngine()
+
+    def create_circuit(self):
+        """Create a simple quantum circuit."""
+        circuit = NumpyCircuit(self.num_qubits)
+        circuit.h(range(self.num_qubits))  # Apply Hadamard gates
+        circuit.measure_all()  # Measure all qubits
+        return circuit
+
+    def statevector(self, circuit):
+        """Return the final statevector of ``circuit`` starting from |0...0>."""
+        state = np.zeros(2**circuit.num_qubits, dtype=complex)
+        state[0] = 1
+        return apply_operations(state, circuit.num_qubits, fuse_operations(circuit.operations))
+
+    def probabilities(self, circuit):
+        """Return the exact outcome probabilities of ``circuit``."""
+        state = self.statevector(circuit)
+        probabilities = state.real**2 + state.imag**2
+        return probabilities / probabilities.sum()
+
+    def _sample_counts(self, circuit, shots):
+        samples = self.shot_engine.counts(circuit.fingerprint(), lambda: self.probabilities(circuit), shots,
+                                          method=self.sampling, rng=self.rng)
+        return Counts.from_array(samples, circuit.num_qubits)
+
+    def execute_circuit(self, circuit, shots=None):
+        """Execute the quantum circuit and return sampled counts."""
+        start_time = time.time()
+        counts = self._sample_counts(circuit, shots or self.shots)
+        end_time = time.time()
+        logging.info(f"Execution Time: {end_time - start_time:.6f} seconds")
+        return counts
+
+    def run_batch(self, circuits, shots=None):
+        """Simulate each circuit in turn and return their sampled counts."""
+        return [self._sample_counts(circuit, shots or self.shots) for circuit in circuits]
+
+    def visualize_results(self, counts):
+        """Visualize the results of the quantum circuit."""
+        plt.bar(list(counts.keys()), list(counts.values()))
+        plt.xlabel('Outcome')
+        plt.ylabel('Frequency')
+        plt.show()
+
+# Example usage
+if __name__ == "__main__":
+    numpy_backend = NumpyBackend(3)
+    circuit = numpy_backend.create_circuit()
+    counts = numpy_backend.execute_circuit(circuit)
+    numpy_backend.visualize_results(counts)
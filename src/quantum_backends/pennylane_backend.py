@@ -1,10 +1,17 @@
 # pennylane_backend.py
 
 import pennylane as qml
+import time
+import logging
 import numpy as np
 import matplotlib.pyplot as plt
+from quantum_backends.base import QuantumBackend
+from quantum_backends.counts import Counts
 
-class PennylaneBackend:
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+class PennylaneBackend(QuantumBackend):
     def __init__(self, num_wires, device_name='default.qubit', wires=None):
         self.num_wires = num_wires
         self.device_name = device_name
@@ -22,6 +29,11 @@ class PennylaneBackend:
             return [qml.probs(wires=i) for i in range(self.num_wires)]
         return circuit
 
+    def create_tape(self):
+        """Create the same Hadamard circuit as a tape for :meth:`run_batch`."""
+        operations = [qml.Hadamard(wires=wire) for wire in self.wires]
+        return qml.tape.QuantumScript(operations, [qml.counts(wires=self.wires)])
+
     def execute_circuit(self, circuit, shots=1024):
         """Execute the quantum circuit with noise models and return results."""
         start_time = time.time()
@@ -32,6 +44,23 @@ class PennylaneBackend:
         logging.info(f"Execution Time: {end_time - start_time:.6f} seconds")
         return probs
 
+    def run_batch(self, circuits, shots=None):
+        """Execute tapes as one batch with ``qml.execute`` and return their counts.
+
+        Only the operations of each tape are used; every wire is sampled.
+        """
+        start_time = time.time()
+        tapes = [qml.tape.QuantumScript(tape.operations, [qml.counts(wires=self.wires)],
+                                        shots=shots or self.default_shots) for tape in circuits]
+        results = qml.execute(tapes, self.dev)
+        end_time = time.time()
+
+        # PennyLane puts the first wire leftmost; reverse so wire 0 is rightmost.
+        batch_counts = [Counts.from_dict({bitstring[::-1]: int(count) for bitstring, count in counts.items()},
+                                         len(self.wires)) for counts in results]
+        logging.info(f"Batch Execution Time: {end_time - start_time:.6f} seconds for {len(batch_counts)} circuits")
+        return batch_counts
+
     def visualize_results(self, probs):
         """Visualize the results of the quantum circuit."""
         plt.bar(range(2**self.num_wires), probs)
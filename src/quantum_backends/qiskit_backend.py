@@ -1,50 +1,225 @@
 # quantum_backends/qiskit_backend.py
 
-from qiskit import QuantumCircuit, Aer, execute, transpile
-from q iskit.visualization import plot_histogram, plot_gate_map, plot_error_map
+from qiskit import QuantumCircuit, Aer, transpile
+from qiskit.visualization import plot_histogram, plot_gate_map, plot_error_map
 from qiskit.compiler import transpile
-from qiskit.providers.aer.noise import depolarizing_error, pauli_error
+from qiskit.providers.aer.noise import NoiseModel, ReadoutError, depolarizing_error
 from qiskit.tools.monitor import job_monitor
+from qiskit.quantum_info import Statevector
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import multiprocessing
 import time
 import logging
 import numpy as np
 import matplotlib.pyplot as plt
+from quantum_backends.base import QuantumBackend
+from quantum_backends.transpile_cache import default_cache, circuit_fingerprint
+from quantum_backends.shot_engine import ShotEngine
+from quantum_backends.counts import Counts
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-class QiskitBackend:
-    def __init__(self, backend_name='qasm_simulator', shots=1024, optimization_level=3):
+# Noisy circuits up to this size are simulated exactly as density matrices;
+# larger ones fall back to Monte-Carlo trajectories on statevectors
+DENSITY_MATRIX_MAX_QUBITS = 10
+# Trajectory runs with fewer shots than this are not worth splitting across processes
+MIN_SHOTS_PER_PROCESS = 1024
+# Largest ideal circuit whose outcome distribution is computed directly for the shot engine
+SHOT_ENGINE_MAX_QUBITS = 24
+
+ONE_QUBIT_GATES = ['u1', 'u2', 'u3', 'h', 'x', 'y', 'z', 's', 't', 'rx', 'ry', 'rz', 'sx']
+TWO_QUBIT_GATES = ['cx', 'cz', 'swap']
+
+@lru_cache(maxsize=32)
+def build_noise_model(gate_error=0.01, readout_error=0.05, two_qubit_error=None):
+    """Build an Aer noise model from depolarizing gate and symmetric readout errors.
+
+    Models are cached by their parameters and shared between callers, so treat
+    the result as read-only. ``two_qubit_error`` defaults to ``gate_error``.
+    """
+    noise_model = NoiseModel()
+    if gate_error:
+        noise_model.add_all_qubit_quantum_error(depolarizing_error(gate_error, 1), ONE_QUBIT_GATES)
+    two_qubit_error = gate_error if two_qubit_error is None else two_qubit_error
+    if two_qubit_error:
+        noise_model.add_all_qubit_quantum_error(depolarizing_error(two_qubit_error, 2), TWO_QUBIT_GATES)
+    if readout_error:
+        noise_model.add_all_qubit_readout_error(ReadoutError([[1 - readout_error, readout_error],
+                                                              [readout_error, 1 - readout_error]]))
+    return noise_model
+
+def simulation_method(num_qubits, noise_model=None):
+    """Pick the Aer simulation method for a circuit of ``num_qubits`` qubits."""
+    if noise_model is None or noise_model.is_ideal():
+        return 'automatic'
+    return 'density_matrix' if num_qubits <= DENSITY_MATRIX_MAX_QUBITS else 'statevector'
+
+def terminal_measurements(circuit):
+    """Return ``[(qubit, clbit), ...]`` if every measurement comes at the end, else ``None``.
+
+    Circuits with resets, conditionals or gates after a measurement on the
+    same qubit are not terminal and have to be simulated shot by shot.
+    """
+    qubit_index = {qubit: index for index, qubit in enumerate(circuit.qubits)}
+    clbit_index = {clbit: index for index, clbit in enumerate(circuit.clbits)}
+    measured = {}
+    for instruction in circuit.data:
+        operation = instruction.operation
+        qubits = [qubit_index[qubit] for qubit in instruction.qubits]
+        if getattr(operation, 'condition', None) is not None:
+            return None
+        if operation.name == 'barrier':
+            continue
+        if operation.name != 'measure':
+            if instruction.clbits or operation.name == 'reset' or any(qubit in measured for qubit in qubits):
+                return None
+            continue
+        if qubits[0] in measured:
+            return None
+        measured[qubits[0]] = clbit_index[instruction.clbits[0]]
+    if len(set(measured.values())) != len(measured):
+        return None
+    return sorted(measured.items(), key=lambda pair: pair[1])
+
+def _measured_distribution(circuit, measurements):
+    """Outcome probabilities over the classical bits of a terminal-measurement circuit."""
+    unitary_part = circuit.copy_empty_like()
+    for instruction in circuit.data:
+        if instruction.operation.name not in ('measure', 'barrier'):
+            unitary_part.append(instruction)
+    qubits = [qubit for qubit, _ in measurements]
+    marginal = Statevector(unitary_part).probabilities(qargs=qubits)
+    # Bit k of a marginal index is the qubit measured into clbit measurements[k][1]
+    indices = np.arange(marginal.size)
+    outcomes = np.zeros(marginal.size, dtype=np.int64)
+    for position, (_, clbit) in enumerate(measurements):
+        outcomes |= ((indices >> position) & 1) << clbit
+    probabilities = np.zeros(1 << circuit.num_clbits)
+    probabilities[outcomes] = marginal
+    return probabilities
+
+def _run_shots(backend_name, circuit, noise_model, method, shots, seed):
+    """Run one share of a split shot budget; module level so worker processes can pickle it."""
+    backend = Aer.get_backend(backend_name)
+    result = backend.run(circuit, shots=shots, noise_model=noise_model, method=method, seed_simulator=seed).result()
+    return result.get_counts(0)
+
+class QiskitBackend(QuantumBackend):
+    def __init__(self, backend_name='qasm_simulator', shots=1024, optimization_level=3, transpile_cache=None,
+                 shot_engine=None):
+        self.backend_name = backend_name
         self.backend = Aer.get_backend(backend_name)
         self.shots = shots
         self.optimization_level = optimization_level
+        self.transpile_cache = transpile_cache or default_cache
+        self.shot_engine = shot_engine or ShotEngine()
 
     def create_circuit(self, num_qubits, gate_error=0.01, readout_error=0.05):
         """Create a simple quantum circuit with noise models."""
         circuit = QuantumCircuit(num_qubits)
-        error_gate1 = depolarizing_error(gate_error, 1)
-        error_gate2 = pauli_error([('X', 0.5), ('Y', 0.3), ('Z', 0.2)])
-        error_readout = pauli_error([('X', readout_error), ('Y', readout_error), ('Z', readout_error)])
-        noise_model = {'errors': [error_gate1, error_gate2, error_readout], 'basis_gates': ['u1', 'u2', 'u3']}
+        noise_model = build_noise_model(gate_error, readout_error)
         circuit.h(range(num_qubits))  # Apply Hadamard gates
         circuit.measure_all()  # Measure all qubits
         return circuit, noise_model
 
-    def execute_circuit(self, circuit, noise_model):
-        """Execute the quantum circuit with noise models and return results."""
+    def sample_counts(self, circuit, shots=None, seed=None, method='multinomial'):
+        """Draw counts for an ideal terminal-measurement circuit from its cached distribution.
+
+        The distribution is computed once per circuit structure, so later calls
+        cost only the sampling. Returns ``None`` for circuits the shot engine
+        cannot handle (mid-circuit measurements, several classical registers,
+        unbound parameters or too many qubits).
+        """
+        if (circuit.num_qubits > SHOT_ENGINE_MAX_QUBITS or len(circuit.cregs) != 1
+                or circuit.parameters):
+            return None
+        measurements = terminal_measurements(circuit)
+        if not measurements:
+            return None
+        rng = None if seed is None else np.random.default_rng(seed)
+        counts = self.shot_engine.counts(circuit_fingerprint(circuit),
+                                         lambda: _measured_distribution(circuit, measurements),
+                                         shots or self.shots, method=method, rng=rng)
+        return Counts.from_array(counts, circuit.num_clbits)
+
+    def execute_circuit(self, circuit, noise_model=None, shots=None, processes=1, seed=None):
+        """Execute the quantum circuit with noise models and return results.
+
+        Small noisy circuits are simulated as density matrices; larger ones use
+        trajectories, whose shots are split over ``processes`` workers with
+        independent seeds derived from ``seed``. Ideal circuits with terminal
+        measurements are sampled by the shot engine instead of simulated per shot.
+        """
+        shots = shots or self.shots
+        if noise_model is None or noise_model.is_ideal():
+            start_time = time.time()
+            counts = self.sample_counts(circuit, shots, seed)
+            if counts is not None:
+                logging.info(f"Execution Time: {time.time() - start_time:.6f} seconds (shot engine)")
+                return counts
+        circuit = self.transpile_cache.transpile(circuit, self.backend)
+        method = simulation_method(circuit.num_qubits, noise_model)
         start_time = time.time()
-        job = execute(circuit, self.backend, shots=self.shots, noise_model=noise_model)
-        job_monitor(job)
-        result = job.result()
+        workers = min(processes, shots // MIN_SHOTS_PER_PROCESS)
+        if method == 'statevector' and workers > 1:
+            seeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(workers)]
+            shares = [len(share) for share in np.array_split(np.arange(shots), workers)]
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                partial_counts = executor.map(_run_shots, [self.backend_name] * workers, [circuit] * workers,
+                                              [noise_model] * workers, [method] * workers, shares, seeds)
+                counts = sum((Counts.from_dict(part) for part in partial_counts), Counts([], [], circuit.num_clbits))
+        else:
+            run_options = {} if seed is None else {'seed_simulator': seed}
+            job = self.backend.run(circuit, shots=shots, noise_model=noise_model, method=method, **run_options)
+            job_monitor(job)
+            result = job.result()
+            counts = Counts.from_dict(result.get_counts(0))
         end_time = time.time()
 
-        counts = result.get_counts(circuit)
-        logging.info(f"Execution Time: {end_time - start_time:.6f} seconds")
+        logging.info(f"Execution Time: {end_time - start_time:.6f} seconds ({method})")
         return counts
 
+    def run_batch(self, circuits, shots=None, noise_model=None):
+        """Execute all circuits in a single Aer job and return their counts.
+
+        Without noise, circuits the shot engine can sample are taken out of the job.
+        The rest are transpiled through the transpile cache, like in
+        :meth:`execute_circuit`, and submitted together.
+        """
+        circuits = list(circuits)
+        shots = shots or self.shots
+        start_time = time.time()
+        batch_counts = [None] * len(circuits)
+        if noise_model is None or noise_model.is_ideal():
+            batch_counts = [self.sample_counts(circuit, shots) for circuit in circuits]
+        pending = [index for index, counts in enumerate(batch_counts) if counts is None]
+        if pending:
+            transpiled = [self.transpile_cache.transpile(circuits[index], self.backend) for index in pending]
+            method = simulation_method(max(circuit.num_qubits for circuit in transpiled), noise_model)
+            result = self.backend.run(transpiled, shots=shots, noise_model=noise_model, method=method).result()
+            for position, index in enumerate(pending):
+                batch_counts[index] = Counts.from_dict(result.get_counts(position))
+        end_time = time.time()
+
+        logging.info(f"Batch Execution Time: {end_time - start_time:.6f} seconds for {len(batch_counts)} circuits")
+        return batch_counts
+
+    def submit_job(self, circuit, shots=None, noise_model=None):
+        """Transpile and submit ``circuit`` without waiting for it; returns the job."""
+        circuit = self.transpile_cache.transpile(circuit, self.backend)
+        method = simulation_method(circuit.num_qubits, noise_model)
+        return self.backend.run(circuit, shots=shots or self.shots, noise_model=noise_model, method=method)
+
+    def job_counts(self, job):
+        """Wait for ``job`` and return its counts."""
+        return Counts.from_dict(job.result().get_counts(0))
+
     def visualize_results(self, counts):
         """Visualize the results of the quantum circuit."""
-        plot_histogram(counts).show()
+        plot_histogram(dict(counts)).show()
 
     def visualize_gate_map(self, backend):
         """Visualize the gate map of the backend."""
@@ -55,8 +230,9 @@ class QiskitBackend:
         plot_error_map(backend).show()
 
     def optimize_circuit(self, circuit):
-        """Optimize the quantum circuit using Qiskit's transpiler."""
-        optimized_circuit = transpile(circuit, basis_gates=['u1', 'u2', 'u3'], optimization_level=self.optimization_level)
+        """Optimize the quantum circuit using Qiskit's transpiler, reusing cached results."""
+        optimized_circuit = self.transpile_cache.transpile(circuit, basis_gates=['u1', 'u2', 'u3'],
+                                                           optimization_level=self.optimization_level)
         return optimized_circuit
 
 # Example usage
@@ -0,0 +1,107 @@
+# quantum_backends/shot_engine.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+
+SAMPLING_METHODS = ('multinomial', 'alias')
+
+class AliasTable:
+    """Walker/Vose alias table for O(1) draws from a discrete distribution.
+
+    Construction pairs every under-full column with an over-full one; the
+    pairing is done a whole batch of columns at a time so that building a table
+    for a 2**20-outcome distribution stays vectorized.
+    """
+
+    def __init__(self, probabilities):
+        probabilities = np.asarray(probabilities, dtype=float)
+        size = probabilities.size
+        scaled = probabilities * (size / probabilities.sum())
+        self.probability = np.ones(size)
+        self.alias = np.arange(size)
+        small = np.flatnonzero(scaled < 1.0)
+        large = np.flatnonzero(scaled >= 1.0)
+        while small.size and large.size:
+            paired = min(small.size, large.size)
+            donors, receivers = large[:paired], small[:paired]
+            self.probability[receivers] = scaled[receivers]
+            self.alias[receivers] = donors
+            scaled[donors] -= 1.0 - scaled[receivers]
+            # Donors that dropped below one become receivers in the next round
+            small = np.concatenate((small[paired:], donors[scaled[donors] < 1.0]))
+            large = np.concatenate((large[paired:], donors[scaled[donors] >= 1.0]))
+        # Leftovers are 1 up to rounding error and keep their own column
+
+    def sample(self, shots, rng):
+        """Draw ``shots`` outcome indices."""
+        columns = rng.integers(self.probability.size, size=shots)
+        accept = rng.random(shots) < self.probability[columns]
+        return np.where(accept, columns, self.alias[columns])
+
+class ShotEngine:
+    """Sample shots from cached final distributions of terminal-measurement circuits.
+
+    When every measurement of a circuit comes at the end, its outcome
+    distribution is fixed, so it is computed once (by the ``compute`` callback a
+    backend passes in) and any number of shots is drawn from it afterwards.
+    Distributions are kept in an LRU keyed by a structural circuit key.
+    """
+
+    def __init__(self, maxsize=128, seed=None):
+        self.maxsize = maxsize
+        self.rng = np.random.default_rng(seed)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+        self.misses += 1
+        probabilities = np.asarray(compute(), dtype=float)
+        entry = {'probabilities': probabilities / probabilities.sum(), 'alias': None}
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def distribution(self, key, compute):
+        """Return the cached outcome probabilities for ``key``, computing them if needed."""
+        return self._entry(key, compute)['probabilities']
+
+    def counts(self, key, compute, shots, method='multinomial', rng=None):
+        """Return a dense array with the number of times each outcome was drawn.
+
+        ``'multinomial'`` draws all counts at once in time independent of
+        ``shots``; ``'alias'`` draws individual shots from an alias table.
+        """
+        entry = self._entry(key, compute)
+        rng = self.rng if rng is None else rng
+        if method == 'multinomial':
+            return rng.multinomial(shots, entry['probabilities'])
+        if method == 'alias':
+            return np.bincount(self._alias(entry).sample(shots, rng), minlength=entry['probabilities'].size)
+        raise ValueError(f"Unknown sampling method '{method}', expected one of {SAMPLING_METHODS}")
+
+    def memory(self, key, compute, shots, rng=None):
+        """Return the outcome index of every individual shot, in order."""
+        entry = self._entry(key, compute)
+        return self._alias(entry).sample(shots, self.rng if rng is None else rng)
+
+    @staticmethod
+    def _alias(entry):
+        if entry['alias'] is None:
+            entry['alias'] = AliasTable(entry['probabilities'])
+        return entry['alias']
+
+    def clear(self):
+        """Drop every cached distribution."""
+        with self._lock:
+            self._entries.clear()
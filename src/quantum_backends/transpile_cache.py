@@ -0,0 +1,138 @@
+# quantum_backends/transpile_cache.py
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from qiskit import qpy, transpile
+from qiskit.circuit import ParameterExpression
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+def _canonical_param(param):
+    if isinstance(param, ParameterExpression):
+        return f"expr:{param}"
+    if isinstance(param, np.ndarray):
+        return f"array:{param.dtype.str}:{param.shape}:{hashlib.sha256(param.tobytes()).hexdigest()}"
+    if isinstance(param, (int, float, complex, np.number)):
+        return repr(complex(param))
+    return repr(param)
+
+def circuit_fingerprint(circuit):
+    """Hash the structure of a circuit: registers sizes, gates, operands and parameters.
+
+    Bits are identified by position, so two circuits built the same way hash the
+    same regardless of object identity or circuit name. Symbolic parameters hash
+    by name, bound ones by value, so circuits that differ only in their angles
+    should be cached as one parametrised template and bound after the lookup.
+    """
+    digest = hashlib.sha256(f"{circuit.num_qubits}:{circuit.num_clbits}".encode())
+    qubit_index = {qubit: index for index, qubit in enumerate(circuit.qubits)}
+    clbit_index = {clbit: index for index, clbit in enumerate(circuit.clbits)}
+    for instruction in circuit.data:
+        operation = instruction.operation
+        condition = getattr(operation, 'condition', None)
+        digest.update(json.dumps([
+            operation.name,
+            [qubit_index[qubit] for qubit in instruction.qubits],
+            [clbit_index[clbit] for clbit in instruction.clbits],
+            [_canonical_param(param) for param in operation.params],
+            repr(condition) if condition is not None else None,
+        ]).encode())
+    return digest.hexdigest()
+
+def _backend_name(backend):
+    if backend is None:
+        return None
+    name = getattr(backend, 'name', None)
+    return name() if callable(name) else name
+
+class TranspileCache:
+    """Two-tier cache of transpiled circuits.
+
+    Keys combine :func:`circuit_fingerprint` with the target backend and the
+    transpiler options (basis gates, optimization level, ...). An in-memory LRU
+    holds up to ``maxsize`` circuits; with ``cache_dir`` entries are also kept
+    as QPY files so later processes skip the transpiler too. Returned circuits
+    are copies renamed to match the input, with the input's own ``Parameter``
+    objects, so callers may modify and bind them.
+    """
+
+    def __init__(self, maxsize=256, cache_dir=None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, circuit, backend=None, **options):
+        """Cache key for transpiling ``circuit`` with ``backend`` and ``options``."""
+        if options.get('basis_gates') is not None:
+            options['basis_gates'] = sorted(options['basis_gates'])
+        target = json.dumps({'backend': _backend_name(backend), **options}, sort_keys=True, default=str)
+        return hashlib.sha256(f"{circuit_fingerprint(circuit)}|{target}".encode()).hexdigest()
+
+    def _remember(self, key, transpiled):
+        with self._lock:
+            self._entries[key] = transpiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key):
+        with self._lock:
+            transpiled = self._entries.get(key)
+            if transpiled is not None:
+                self._entries.move_to_end(key)
+                return transpiled
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f'{key}.qpy')
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    transpiled = qpy.load(f)[0]
+                self._remember(key, transpiled)
+                return transpiled
+        return None
+
+    def transpile(self, circuit, backend=None, **options):
+        """Return ``transpile(circuit, backend, **options)``, reusing earlier results."""
+        key = self.key(circuit, backend, **options)
+        transpiled = self._lookup(key)
+        if transpiled is None:
+            self.misses += 1
+            transpiled = transpile(circuit, backend=backend, **options)
+            self._remember(key, transpiled)
+            if self.cache_dir:
+                path = os.path.join(self.cache_dir, f'{key}.qpy')
+                with open(f'{path}.tmp{os.getpid()}', 'wb') as f:
+                    qpy.dump(transpiled, f)
+                os.replace(f'{path}.tmp{os.getpid()}', path)
+        else:
+            self.hits += 1
+        result = transpiled.copy()
+        result.name = circuit.name
+        # Symbolic parameters are keyed by name; hand back the caller's own objects
+        own = {parameter.name: parameter for parameter in circuit.parameters}
+        renamed = {parameter: own[parameter.name] for parameter in result.parameters
+                   if parameter.name in own and parameter != own[parameter.name]}
+        if renamed:
+            result.assign_parameters(renamed, inplace=True)
+        return result
+
+    def clear(self):
+        """Drop the in-memory tier (files in ``cache_dir`` are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+default_cache = TranspileCache()
+
+def cached_transpile(circuit, backend=None, cache=None, **options):
+    """Transpile through ``cache`` (the shared module cache by default)."""
+    return (cache or default_cache).transpile(circuit, backend, **options)
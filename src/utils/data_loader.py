@@ -1,26 +1,320 @@
 # utils/data_loader.py
 
+import io
+import os
+import json
+import queue
+import shutil
+import sqlite3
+import hashlib
+import threading
+from collections import deque
+from contextlib import closing, contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 import logging
 
+class ColumnarCache:
+    """Cache parsed tables as one memory-mapped ``.npy`` file per column.
+
+    Entries live in ``<cache_dir>/<path>-<version>-<options>`` where the version
+    hash covers the source size and modification time, so a changed source
+    misses the cache and entries for its old versions are removed when the new
+    one is written.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _entry_name(self, source_path, options):
+        stat = os.stat(source_path)
+        source = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()[:16]
+        version = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+        reader = hashlib.sha1(json.dumps(options, sort_keys=True, default=str).encode()).hexdigest()[:12]
+        return source, version, f"{source}-{version}-{reader}"
+
+    def _meta(self, source_path, options):
+        """Return ``(entry directory, metadata)`` or ``(None, None)`` on a miss."""
+        _, _, name = self._entry_name(source_path, options)
+        entry = os.path.join(self.cache_dir, name)
+        meta_path = os.path.join(entry, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None, None
+        with open(meta_path, 'r') as f:
+            return entry, json.load(f)
+
+    def num_rows(self, source_path, options=None):
+        """Return the number of cached rows for ``source_path`` or ``None`` on a miss."""
+        entry, meta = self._meta(source_path, options)
+        if meta is None:
+            return None
+        if not meta['columns']:
+            return 0
+        return len(np.load(os.path.join(entry, '0.npy'), mmap_mode='r'))
+
+    def load(self, source_path, options=None, rows=None):
+        """Return the cached table for ``source_path`` or ``None`` on a miss.
+
+        ``rows`` (a slice) restricts the result to those rows, which are read
+        straight from the memory maps.
+        """
+        entry, meta = self._meta(source_path, options)
+        if meta is None:
+            return None
+        columns = {}
+        for index, column in enumerate(meta['columns']):
+            values = np.load(os.path.join(entry, f'{index}.npy'), mmap_mode='c')
+            values = np.asarray(values if rows is None else values[rows])
+            if column['kind'] == 'array':
+                columns[column['name']] = values
+                continue
+            categories = np.load(os.path.join(entry, f'{index}.categories.npy'), allow_pickle=False)
+            restored = pd.Categorical.from_codes(values, categories)
+            if column['kind'] == 'category':
+                columns[column['name']] = restored
+            else:
+                columns[column['name']] = pd.Series(restored).astype(column['dtype'])
+        return pd.DataFrame(columns, copy=False)
+
+    def store(self, source_path, data, options=None):
+        """Write ``data`` to the cache; returns False if a column cannot be stored."""
+        source, version, name = self._entry_name(source_path, options)
+        entry = os.path.join(self.cache_dir, name)
+        staging = f"{entry}.tmp{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)  # Also creates the cache directory itself
+        meta = {'columns': []}
+        try:
+            for index, column_name in enumerate(data.columns):
+                series = data[column_name]
+                column = {'name': column_name, 'dtype': str(series.dtype)}
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    column['kind'] = 'category'
+                    codes, categories = series.cat.codes.to_numpy(), series.cat.categories.to_numpy()
+                elif isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+                    column['kind'] = 'array'
+                    codes, categories = series.to_numpy(), None
+                else:
+                    column['kind'] = 'factorized'
+                    codes, categories = pd.factorize(series)
+                if categories is not None:
+                    categories = np.asarray(categories)
+                    if categories.dtype == object:
+                        categories = categories.astype(str)
+                    np.save(os.path.join(staging, f'{index}.categories.npy'), categories, allow_pickle=False)
+                np.save(os.path.join(staging, f'{index}.npy'), codes, allow_pickle=False)
+                meta['columns'].append(column)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Not caching {source_path}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        for stale in os.listdir(self.cache_dir):
+            outdated = stale.startswith(f"{source}-") and not stale.startswith(f"{source}-{version}-")
+            if outdated and '.tmp' not in stale:
+                shutil.rmtree(os.path.join(self.cache_dir, stale), ignore_errors=True)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+        return True
+
+def _query(connection, sql, params=()):
+    """Run ``sql`` on a cursor of any DB-API connection and return the rows as a DataFrame."""
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+class ConnectionPool:
+    """Bounded pool of database connections shared between worker threads."""
+
+    def __init__(self, connect, size):
+        self._connect = connect
+        self.size = size
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, opening a new one only while under ``size``."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            connection = self._connect() if create else self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
 class DataLoader:
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, cache_dir=None):
         self.file_path = file_path
+        self.cache = ColumnarCache(cache_dir) if cache_dir else None
         logging.basicConfig(level=logging.INFO)
 
-    def load_csv(self):
-        """Load data from a CSV file."""
+    def load_csv(self, columns=None, dtype=None, use_cache=True):
+        """Load data from a CSV file.
+
+        With a ``cache_dir`` the parsed table is kept in a columnar binary cache
+        and later loads memory-map it instead of re-parsing the text.
+        """
         if not self.file_path:
             raise ValueError("File path must be provided.")
         try:
-            data = pd.read_csv(self.file_path)
+            options = {'columns': columns, 'dtype': dtype}
+            if self.cache and use_cache:
+                data = self.cache.load(self.file_path, options)
+                if data is not None:
+                    logging.info(f"Loaded data from cache for {self.file_path}")
+                    return data
+            data = pd.read_csv(self.file_path, usecols=columns, dtype=dtype)
             logging.info(f"Loaded data from {self.file_path}")
+            if self.cache and use_cache:
+                self.cache.store(self.file_path, data, options)
             return data
         except Exception as e:
             logging.error(f"Error loading CSV: {e}")
             return None
 
+    def csv_byte_ranges(self, target_bytes):
+        """Split the CSV body into ``(start, end)`` byte ranges of roughly ``target_bytes``.
+
+        Ranges start after the header and end on line boundaries, so each one holds
+        whole rows. Quoted fields containing newlines are not supported.
+        """
+        if not self.file_path:
+            raise ValueError("File path must be provided.")
+        size = os.path.getsize(self.file_path)
+        ranges = []
+        with open(self.file_path, 'rb') as f:
+            f.readline()
+            start = f.tell()
+            while start < size:
+                f.seek(min(start + target_bytes, size))
+                if f.tell() < size:
+                    f.readline()
+                end = f.tell()
+                ranges.append((start, end))
+                start = end
+        return ranges
+
+    def load_csv_range(self, start, end, columns=None, dtype=None):
+        """Parse the rows stored between byte offsets ``start`` and ``end`` of the CSV."""
+        if not self.file_path:
+            raise ValueError("File path must be provided.")
+        with open(self.file_path, 'rb') as f:
+            header = f.readline()
+            f.seek(start)
+            body = f.read(end - start)
+        return pd.read_csv(io.BytesIO(header + body), usecols=columns, dtype=dtype)
+
+    def infer_compact_dtypes(self, columns=None, sample_rows=10000, max_category_ratio=0.5):
+        """Infer compact dtypes from the first ``sample_rows`` rows of the CSV.
+
+        Floating point columns become ``float32`` and text columns with few
+        distinct values (relative to the sample) become ``category``. Integer
+        columns are left alone, since a sample cannot prove later rows fit a
+        narrower type.
+        """
+        if not self.file_path:
+            raise ValueError("File path must be provided.")
+        sample = pd.read_csv(self.file_path, usecols=columns, nrows=sample_rows)
+        dtypes = {}
+        for column in sample.columns:
+            series = sample[column]
+            if pd.api.types.is_float_dtype(series):
+                dtypes[column] = np.float32
+            elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+                if len(series) and series.nunique() <= max_category_ratio * len(series):
+                    dtypes[column] = 'category'
+        return dtypes
+
+    def iter_csv(self, chunksize=100000, columns=None, dtype=None, compact=False):
+        """Stream the CSV as DataFrames of at most ``chunksize`` rows.
+
+        ``columns`` restricts parsing to a subset of columns and ``dtype`` maps
+        columns to explicit dtypes. With ``compact=True`` dtypes are inferred by
+        :meth:`infer_compact_dtypes`, with any explicit ``dtype`` entries taking
+        precedence. Category levels are per chunk; use
+        ``pd.api.types.union_categoricals`` when combining chunks.
+
+        Unlike :meth:`load_csv`, errors are raised rather than logged, because a
+        stream that silently stops part way through looks like a short file.
+        """
+        if not self.file_path:
+            raise ValueError("File path must be provided.")
+        if compact:
+            dtype = {**self.infer_compact_dtypes(columns), **(dtype or {})}
+        with pd.read_csv(self.file_path, usecols=columns, dtype=dtype, chunksize=chunksize) as reader:
+            for index, chunk in enumerate(reader):
+                logging.debug(f"Read chunk {index} ({len(chunk)} rows) from {self.file_path}")
+                yield chunk
+
+    def iter_from_database(self, query, database, partition_column, num_partitions=None,
+                           max_workers=4, connect=None, placeholder='?'):
+        """Stream a query as DataFrames fetched concurrently over key-range partitions.
+
+        The range of ``partition_column`` in the result of ``query`` is split into
+        ``num_partitions`` (default ``4 * max_workers``) contiguous ranges and each
+        is read with its own ``SELECT`` on a pool of at most ``max_workers``
+        connections. At most ``max_workers`` partitions are in flight, and they are
+        yielded in key order. ``connect`` builds a connection and defaults to
+        SQLite on ``database``; with another driver pass its parameter marker as
+        ``placeholder`` (``'%s'`` for psycopg). To partition a table by rowid,
+        select it explicitly, e.g. ``SELECT rowid AS row_id, * FROM measurements``.
+        """
+        if connect is None:
+            connect = lambda: sqlite3.connect(database, check_same_thread=False)
+        num_partitions = num_partitions or 4 * max_workers
+        pool = ConnectionPool(connect, max_workers)
+        try:
+            with pool.connection() as connection:
+                with closing(connection.cursor()) as cursor:
+                    cursor.execute(f"SELECT MIN({partition_column}), MAX({partition_column}) "
+                                   f"FROM ({query}) AS source")
+                    low, high = cursor.fetchone()
+            if low is None:
+                return
+            if isinstance(low, int) and isinstance(high, int):
+                step = -(-(high - low + 1) // num_partitions)
+                bounds = [min(low + k * step, high + 1) for k in range(num_partitions + 1)]
+            else:
+                bounds = list(np.linspace(low, high, num_partitions + 1))
+            ranges = [(bounds[k], bounds[k + 1], k == num_partitions - 1) for k in range(num_partitions)
+                      if bounds[k] < bounds[k + 1] or k == num_partitions - 1]
+
+            def fetch(start, end, last):
+                upper = '<=' if last else '<'
+                sql = (f"SELECT * FROM ({query}) AS source WHERE {partition_column} >= {placeholder} "
+                       f"AND {partition_column} {upper} {placeholder}")
+                with pool.connection() as connection:
+                    return _query(connection, sql, (start, end))
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pending = deque()
+                for start, end, last in ranges:
+                    pending.append(executor.submit(fetch, start, end, last))
+                    if len(pending) >= max_workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            logging.info(f"Loaded {len(ranges)} partitions from database")
+        finally:
+            pool.close()
+
     def load_from_database(self, query, connection):
         """Load data from a database using a SQL query."""
         try:
@@ -1,5 +1,6 @@
 # utils/data_processor.py
 
+import re
 import numpy as np
 import pandas as pd
 import logging
@@ -9,11 +10,21 @@ class DataProcessor:
         self.data = data
         logging.basicConfig(level=logging.INFO)
 
-    def normalize(self):
-        """Normalize the data to a range of [0, 1]."""
+    def normalize(self, stats=None, method='minmax'):
+        """Normalize the data to a range of [0, 1].
+
+        With a :class:`RunningStats` the statistics gathered from a stream or
+        other shards are used instead of those of ``self.data``, and ``method``
+        may also be ``'zscore'``.
+        """
         if self.data is None:
             raise ValueError("Data must be loaded before processing.")
-        normalized_data = (self.data - self.data.min()) / (self.data.max() - self.data.min())
+        if stats is not None:
+            normalized_data = stats.normalize(self.data, method=method)
+        elif method == 'minmax':
+            normalized_data = (self.data - self.data.min()) / (self.data.max() - self.data.min())
+        else:
+            normalized_data = RunningStats().update(self.data).normalize(self.data, method=method)
         logging.info("Data normalized")
         return normalized_data
 
@@ -28,3 +39,269 @@ class DataProcessor:
         features = self.data[feature_columns]
         logging.info("Features extracted")
         return features
+
+    def lazy(self):
+        """Start a :class:`DataPipeline` over the data."""
+        if self.data is None:
+            raise ValueError("Data must be loaded before processing.")
+        return DataPipeline(self.data)
+
+class RunningStats:
+    """Mergeable per-column statistics for chunked or sharded data.
+
+    Keeps counts, min/max and Welford mean/variance for every numeric column,
+    plus a small equal-weight centroid sketch per column for approximate
+    quantiles. Statistics from different chunks or workers combine with
+    :meth:`merge` (Chan et al. for the moments), so normalisation parameters
+    are available after a single pass. NaNs are ignored, as in pandas.
+    """
+
+    def __init__(self, columns=None, sketch_size=256):
+        self.columns = None if columns is None else list(columns)
+        self.sketch_size = sketch_size
+        self.count = self.mean = self.m2 = self.min = self.max = None
+        self._sketches = None
+        if self.columns is not None:
+            self._reset()
+
+    def _reset(self):
+        width = len(self.columns)
+        self.count = np.zeros(width)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self._sketches = [(np.empty(0), np.empty(0)) for _ in range(width)]
+
+    @classmethod
+    def from_chunks(cls, chunks, columns=None, sketch_size=256):
+        """Accumulate statistics over an iterable of DataFrames."""
+        stats = cls(columns, sketch_size)
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats
+
+    def _compress(self, centroids, weights):
+        """Reduce weighted centroids to at most ``sketch_size`` equal-weight groups."""
+        if len(centroids) <= self.sketch_size:
+            return centroids, weights
+        order = np.argsort(centroids, kind='stable')
+        centroids, weights = centroids[order], weights[order]
+        cumulative = np.cumsum(weights)
+        groups = np.minimum(((cumulative - weights / 2) / cumulative[-1] * self.sketch_size).astype(np.int64),
+                            self.sketch_size - 1)
+        group_weights = np.bincount(groups, weights=weights, minlength=self.sketch_size)
+        group_sums = np.bincount(groups, weights=weights * centroids, minlength=self.sketch_size)
+        used = group_weights > 0
+        return group_sums[used] / group_weights[used], group_weights[used]
+
+    def _combine(self, count, mean, m2, low, high, sketches):
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = np.where(total > 0, count / total, 0.0)
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + m2 + delta**2 * self.count * share
+        self.count = total
+        self.min = np.fmin(self.min, low)
+        self.max = np.fmax(self.max, high)
+        for index, (centroids, weights) in enumerate(sketches):
+            current, current_weights = self._sketches[index]
+            self._sketches[index] = self._compress(np.concatenate((current, centroids)),
+                                                   np.concatenate((current_weights, weights)))
+
+    def update(self, chunk):
+        """Fold a DataFrame chunk into the statistics."""
+        if self.columns is None:
+            self.columns = list(chunk.select_dtypes(include='number').columns)
+            self._reset()
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+        m2 = np.nansum((values - mean)**2, axis=0)
+        low = np.where(count > 0, np.nanmin(np.where(valid, values, np.inf), axis=0), np.inf)
+        high = np.where(count > 0, np.nanmax(np.where(valid, values, -np.inf), axis=0), -np.inf)
+        sketches = []
+        for index in range(len(self.columns)):
+            column = values[valid[:, index], index]
+            sketches.append(self._compress(column, np.ones(len(column))))
+        self._combine(count, mean, m2, low, high, sketches)
+        return self
+
+    def merge(self, other):
+        """Fold another :class:`RunningStats` over the same columns into this one."""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns = list(other.columns)
+            self._reset()
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge statistics over different columns.")
+        self._combine(other.count, other.mean, other.m2, other.min, other.max, other._sketches)
+        return self
+
+    def variance(self, ddof=1):
+        """Per-column variance (sample variance by default, like pandas)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.Series(np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan), index=self.columns)
+
+    def std(self, ddof=1):
+        """Per-column standard deviation."""
+        return np.sqrt(self.variance(ddof))
+
+    def quantile(self, q):
+        """Approximate per-column quantile(s) from the centroid sketches."""
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        result = np.full((len(q), len(self.columns)), np.nan)
+        for index, (centroids, weights) in enumerate(self._sketches):
+            if len(centroids) == 0:
+                continue
+            order = np.argsort(centroids, kind='stable')
+            centroids, weights = centroids[order], weights[order]
+            positions = np.cumsum(weights) - weights / 2
+            points = np.concatenate(([self.min[index]], centroids, [self.max[index]]))
+            ranks = np.concatenate(([0.0], positions, [weights.sum()]))
+            result[:, index] = np.interp(q * weights.sum(), ranks, points)
+        if scalar:
+            return pd.Series(result[0], index=self.columns)
+        return pd.DataFrame(result, index=q, columns=self.columns)
+
+    def normalize(self, chunk, method='minmax'):
+        """Scale the tracked columns of ``chunk`` using the accumulated statistics."""
+        if method == 'minmax':
+            offset, scale = self.min, self.max - self.min
+        elif method == 'zscore':
+            offset, scale = self.mean, self.std().to_numpy()
+        else:
+            raise ValueError(f"Unknown normalization method: {method}")
+        normalized = chunk.copy()
+        normalized[self.columns] = (chunk[self.columns].to_numpy(dtype=np.float64) - offset) / scale
+        return normalized
+
+class DataPipeline:
+    """Record processing steps and run them in one pass when collected.
+
+    Steps apply in the order they are added, with the same meaning as the
+    eager :class:`DataProcessor` methods. :meth:`collect` plans the whole chain
+    first: filters are moved ahead of element-wise column transforms they do
+    not depend on, only source columns that reach the output (or feed a filter or transform)
+    are read, and transforms whose result is never used are dropped. Only the
+    final result is built as a DataFrame.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.steps = []
+
+    def normalize(self, columns=None):
+        """Min-max scale ``columns`` (default: every numeric column) to [0, 1]."""
+        self.steps.append(('normalize', None if columns is None else list(columns)))
+        return self
+
+    def filter(self, condition):
+        """Keep the rows matching a ``DataFrame.query`` style condition."""
+        self.steps.append(('filter', condition))
+        return self
+
+    def select(self, columns):
+        """Keep only ``columns``, in the given order."""
+        self.steps.append(('select', list(columns)))
+        return self
+
+    def with_column(self, name, func, inputs=None, elementwise=False):
+        """Set ``name`` to ``func(*input_arrays)``; ``inputs`` defaults to ``[name]``.
+
+        Pass ``elementwise=True`` when each output row depends only on the same
+        input row, so a later filter may run first. Functions that look at the
+        whole column, such as ``a - a.mean()``, must keep the default.
+        """
+        inputs = list(inputs) if inputs is not None else [name]
+        self.steps.append(('transform', name, func, inputs, elementwise))
+        return self
+
+    @staticmethod
+    def _references(condition, columns):
+        names = set()
+        for quoted, bare in re.findall(r'`([^`]+)`|([A-Za-z_]\w*)', condition):
+            names.add(quoted or bare)
+        return [column for column in columns if column in names]
+
+    def _output_columns(self):
+        """Column names present after each step, starting with the source columns."""
+        columns = list(self.data.columns)
+        history = [columns]
+        for step in self.steps:
+            if step[0] == 'select':
+                columns = list(step[1])
+            elif step[0] == 'transform' and step[1] not in columns:
+                columns = columns + [step[1]]
+            history.append(columns)
+        return history
+
+    def plan(self):
+        """Return the optimised step list and the source columns it reads."""
+        history = self._output_columns()
+        steps = []
+        for step, available in zip(self.steps, history):
+            if step[0] == 'filter':
+                step = ('filter', step[1], self._references(step[1], available))
+                position = len(steps)
+                while position > 0:
+                    previous = steps[position - 1]
+                    movable = previous[0] == 'select' or (previous[0] == 'transform' and previous[4]
+                                                          and previous[1] not in step[2])
+                    if not movable:
+                        break
+                    position -= 1
+                steps.insert(position, step)
+            else:
+                steps.append(step)
+
+        needed = set(history[-1])
+        pruned = []
+        for step in reversed(steps):
+            if step[0] == 'select':
+                needed &= set(step[1])
+            elif step[0] == 'transform':
+                if step[1] not in needed:
+                    continue
+                needed = (needed - {step[1]}) | set(step[3])
+            elif step[0] == 'filter':
+                needed |= set(step[2])
+            pruned.append(step)
+        pruned.reverse()
+        source_columns = [column for column in self.data.columns if column in needed]
+        return pruned, source_columns
+
+    def collect(self):
+        """Execute the planned steps and materialise the result."""
+        steps, source_columns = self.plan()
+        # Extension arrays (e.g. pandas strings) are kept as they are, so their dtype survives
+        columns = {column: self.data[column].to_numpy() if isinstance(self.data[column].dtype, np.dtype)
+                   else self.data[column].array for column in source_columns}
+        rows = np.arange(len(self.data))
+        for step in steps:
+            if step[0] == 'filter':
+                frame = pd.DataFrame({column: columns[column] for column in step[2]}, copy=False)
+                mask = np.asarray(frame.eval(step[1]), dtype=bool)
+                columns = {column: values[mask] for column, values in columns.items()}
+                rows = rows[mask]
+            elif step[0] == 'normalize':
+                targets = step[1] if step[1] is not None else list(columns)
+                for column in targets:
+                    values = columns.get(column)
+                    if not isinstance(values, np.ndarray) or not np.issubdtype(values.dtype, np.number):
+                        continue
+                    low, high = np.nanmin(values), np.nanmax(values)
+                    columns[column] = (values - low) / (high - low)
+            elif step[0] == 'select':
+                columns = {column: columns[column] for column in step[1] if column in columns}
+            elif step[0] == 'transform':
+                columns[step[1]] = np.asarray(step[2](*[columns[column] for column in step[3]]))
+        order = [column for column in self._output_columns()[-1] if column in columns]
+        result = pd.DataFrame({column: columns[column] for column in order}, index=self.data.index[rows], copy=False)
+        logging.info(f"Pipeline of {len(self.steps)} steps collected")
+        return result
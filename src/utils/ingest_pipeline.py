@@ -0,0 +1,309 @@
+# utils/ingest_pipeline.py
+
+import os
+import itertools
+import logging
+import numpy as np
+import pandas as pd
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from utils.data_loader import ColumnarCache, DataLoader
+from utils.data_processor import DataProcessor, RunningStats
+
+# Cache entries are keyed like a plain DataLoader.load_csv(), so the two share them
+CACHE_OPTIONS = {'columns': None, 'dtype': None}
+# Rows read from the head of every file to infer the schema shared by all shards
+SCHEMA_SAMPLE_ROWS = 10000
+
+def _infer_schema(file_paths, sample_rows=SCHEMA_SAMPLE_ROWS):
+    """Infer the dtypes every shard is parsed with from the head of each file.
+
+    Shards parsed on their own can disagree on whether a column is numeric, for
+    example when it is empty in the first shards and holds text later, and
+    their statistics would then not merge. Columns with text, or no values at
+    all, in any sample are read as text and float columns as float64. Integer
+    and boolean columns are left to each shard: missing values only widen them
+    to float64 and object, which concatenate like a serial load would.
+
+    Returns ``(dtype, unresolved)`` where ``unresolved`` lists the columns that
+    had no values in any sample.
+    """
+    dtype, seen = {}, set()
+    for path in file_paths:
+        sample = pd.read_csv(path, nrows=sample_rows)
+        for column in sample.columns:
+            series = sample[column].dropna().infer_objects()
+            if len(series):
+                seen.add(column)
+            if not len(series) or not (pd.api.types.is_numeric_dtype(series)
+                                       or pd.api.types.is_bool_dtype(series)):
+                dtype[column] = str
+            elif pd.api.types.is_float_dtype(series) and dtype.get(column) is not str:
+                dtype[column] = np.float64
+    return dtype, [column for column, kind in dtype.items() if kind is str and column not in seen]
+
+def _resolve_columns(frame, unresolved):
+    """Give columns that had no values in the schema sample the dtype a serial load would."""
+    for column in unresolved:
+        if column in frame:
+            try:
+                frame[column] = pd.to_numeric(frame[column])
+            except (TypeError, ValueError):
+                pass
+    return frame
+
+def _share(values):
+    """Copy a 1-D array into a new shared memory block and return its description."""
+    if values.nbytes == 0:
+        return None, values.dtype.str, len(values)
+    block = shared_memory.SharedMemory(create=True, size=values.nbytes)
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+    block.close()
+    # Ownership passes to the parent, which unlinks the block after copying it;
+    # without this the resource tracker would remove it when the worker exits.
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return block.name, values.dtype.str, len(values)
+
+def _take(shared):
+    """Copy a shared array out of its block and unlink the block."""
+    block_name, dtype, length = shared
+    if block_name is None:
+        return np.empty(length, dtype=np.dtype(dtype))
+    block = shared_memory.SharedMemory(name=block_name)
+    values = np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf).copy()
+    block.close()
+    block.unlink()
+    return values
+
+def _export_column(name, series):
+    """Move one column into shared memory blocks.
+
+    Numeric and datetime columns are shared as they are. Other columns are
+    factorized into integer codes and their distinct values; text values are
+    stored as one UTF-8 buffer plus offsets, in the manner of Arrow.
+    """
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+        return name, str(series.dtype), {'values': _share(series.to_numpy())}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, categories = pd.factorize(series)
+    categories = np.asarray(categories, dtype=object)
+    if all(isinstance(value, str) for value in categories):
+        encoded = [value.encode('utf-8') for value in categories]
+        offsets = np.cumsum([0] + [len(value) for value in encoded], dtype=np.int64)
+        arrays = {'offsets': offsets, 'text': np.frombuffer(b''.join(encoded), dtype=np.uint8)}
+    else:
+        categories = np.array(categories.tolist())
+        if categories.dtype.kind not in 'biufcmM':
+            raise TypeError(f"Cannot share column {name!r} of dtype {series.dtype} between processes")
+        arrays = {'categories': categories}
+    shared = {}
+    try:
+        for key, values in {'codes': codes, **arrays}.items():
+            shared[key] = _share(values)
+    except BaseException:
+        _free_frames({'partial': {'columns': [(name, None, shared)]}})
+        raise
+    return name, str(series.dtype), shared
+
+def _import_column(dtype, arrays):
+    """Rebuild one exported column and free its blocks."""
+    if 'values' in arrays:
+        return _take(arrays['values'])
+    codes = _take(arrays['codes'])
+    if 'text' in arrays:
+        offsets, text = _take(arrays['offsets']), _take(arrays['text']).tobytes()
+        categories = np.array([text[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])],
+                              dtype=object)
+    else:
+        categories = _take(arrays['categories'])
+    return pd.Series(pd.Categorical.from_codes(codes, categories)).astype(dtype)
+
+def _export_frame(frame):
+    """Move the columns of ``frame`` into shared memory blocks.
+
+    Returns a description the parent can rebuild the frame from; it holds only
+    block names, dtypes and lengths, never column data.
+    """
+    columns = []
+    try:
+        for name in frame.columns:
+            columns.append(_export_column(name, frame[name]))
+    except BaseException:
+        _free_frames({'partial': {'columns': columns}})
+        raise
+    return {'columns': columns, 'length': len(frame)}
+
+def _import_frames(parts):
+    """Concatenate exported shard frames into one DataFrame and free the blocks."""
+    if not parts:
+        return pd.DataFrame()
+    data = {}
+    for index, (name, _, _) in enumerate(parts[0]['columns']):
+        pieces = [_import_column(*part['columns'][index][1:]) for part in parts]
+        # Shards without rows say nothing about the column, and pandas may type them as object
+        pieces = [piece for piece in pieces if len(piece)] or pieces[:1]
+        if all(isinstance(piece, np.ndarray) for piece in pieces):
+            data[name] = np.concatenate(pieces)
+        else:
+            data[name] = pd.concat([pd.Series(piece) for piece in pieces], ignore_index=True)
+    return pd.DataFrame(data, copy=False)
+
+def _free_frames(exported):
+    """Unlink the shared memory blocks of exported frames that will not be imported.
+
+    Blocks that were already imported (and so unlinked) are skipped.
+    """
+    for part in exported.values():
+        for _, _, arrays in part['columns']:
+            for block_name, _, _ in arrays.values():
+                if block_name is None:
+                    continue
+                try:
+                    block = shared_memory.SharedMemory(name=block_name)
+                except FileNotFoundError:
+                    continue
+                block.close()
+                block.unlink()
+
+def _load_shard(path, start, end, cache_dir, dtype):
+    """Rows ``start:end`` of the cached table with a ``cache_dir``, else bytes ``start:end`` of the CSV.
+
+    Both are read with the shared schema ``dtype``.
+    """
+    if cache_dir is None:
+        return DataLoader(file_path=path).load_csv_range(start, end, dtype=dtype)
+    data = ColumnarCache(cache_dir).load(path, CACHE_OPTIONS, rows=slice(start, end))
+    if data is None:
+        raise FileNotFoundError(f"Cache entry for {path} disappeared during ingestion")
+    for column, kind in dtype.items():
+        # Only happens for columns without values in this file; object keeps the NaNs
+        if kind is str and column in data and pd.api.types.is_numeric_dtype(data[column]):
+            data[column] = data[column].astype(object)
+    return data
+
+def _process_shard(path, start, end, cache_dir, dtype, condition, filter_columns, feature_columns):
+    """Worker: load one shard, gather statistics and extract the outputs."""
+    data = _load_shard(path, start, end, cache_dir, dtype)
+    stats = RunningStats().update(data)
+    outputs = {'data': data}
+    if condition is not None:
+        pipeline = DataProcessor(data).lazy().filter(condition)
+        if filter_columns is not None:
+            pipeline = pipeline.select(filter_columns)
+        outputs['filtered'] = pipeline.collect()
+    if feature_columns is not None:
+        outputs['features'] = DataProcessor(data).extract_features(feature_columns)
+    exported = {}
+    try:
+        for name, frame in outputs.items():
+            exported[name] = _export_frame(frame)
+    except BaseException:
+        _free_frames(exported)
+        raise
+    return stats, exported
+
+class IngestPipeline:
+    """Load, process and extract features from CSV files across a process pool.
+
+    Every file is split into line-aligned byte ranges of about ``shard_bytes``
+    and each range runs load -> filter -> feature extraction in a worker.
+    All shards are parsed with one schema inferred from the head of every file.
+    Results come back through shared memory rather than pickled DataFrames,
+    and per-shard :class:`RunningStats` are merged so the combined data can be
+    min-max normalized without another pass.
+
+    With a ``cache_dir`` files already in the :class:`ColumnarCache` are split
+    into row ranges of the cached columns instead, which workers memory-map
+    rather than parse; files that missed are written to the cache after the run.
+    ``filter_columns`` restricts the filtered output, so its lazy pipeline only
+    reads the columns it needs.
+    """
+
+    def __init__(self, file_paths, condition=None, feature_columns=None, processes=None,
+                 shard_bytes=32 * 1024**2, cache_dir=None, filter_columns=None):
+        self.file_paths = list(file_paths)
+        self.condition = condition
+        self.feature_columns = feature_columns
+        self.processes = processes
+        self.shard_bytes = shard_bytes
+        self.cache_dir = cache_dir
+        self.filter_columns = filter_columns
+        logging.basicConfig(level=logging.INFO)
+
+    def shards(self):
+        """List the ``(path, start, end, cache_dir)`` work items for every input file.
+
+        ``cache_dir`` is None for byte ranges of the CSV text and set for row
+        ranges of a cached table.
+        """
+        cache = ColumnarCache(self.cache_dir) if self.cache_dir else None
+        items = []
+        for path in self.file_paths:
+            num_rows = cache.num_rows(path, CACHE_OPTIONS) if cache else None
+            if num_rows is None:
+                items.extend((path, start, end, None)
+                             for start, end in DataLoader(file_path=path).csv_byte_ranges(self.shard_bytes))
+                continue
+            # Same number of shards as the text would have been split into
+            step = max(1, self.shard_bytes * num_rows // max(os.path.getsize(path), 1))
+            items.extend((path, start, min(start + step, num_rows), self.cache_dir)
+                         for start in range(0, num_rows, step))
+        return items
+
+    def _collect(self, executor, shards, dtype):
+        futures = [executor.submit(_process_shard, path, start, end, cache_dir, dtype, self.condition,
+                                   self.filter_columns, self.feature_columns)
+                   for path, start, end, cache_dir in shards]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            # Exported blocks are owned by no process until imported, so free them here
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            for future in futures:
+                if not future.cancelled() and future.exception() is None:
+                    _free_frames(future.result()[1])
+            raise
+
+    def _store_cache(self, shards, results, data, unresolved):
+        """Write the rows of every file that was parsed from text to the cache."""
+        cache = ColumnarCache(self.cache_dir)
+        start = 0
+        for path, group in itertools.groupby(zip(shards, results), key=lambda item: item[0][0]):
+            group = list(group)
+            stop = start + sum(outputs['data']['length'] for _, (_, outputs) in group)
+            if group[0][0][3] is None:
+                rows = _resolve_columns(data.iloc[start:stop].reset_index(drop=True), unresolved)
+                cache.store(path, rows, CACHE_OPTIONS)
+            start = stop
+
+    def run(self):
+        """Process all shards and return the combined outputs as a dict."""
+        shards = self.shards()
+        dtype, unresolved = _infer_schema(self.file_paths)
+        # Spawned rather than forked: the parent may already be running numba's
+        # thread pool, which does not survive fork().
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=context) as executor:
+            results = self._collect(executor, shards, dtype)
+        try:
+            stats = RunningStats()
+            for shard_stats, _ in results:
+                stats.merge(shard_stats)
+            combined = {name: _resolve_columns(_import_frames([outputs[name] for _, outputs in results]), unresolved)
+                        for name in (results[0][1] if results else {})}
+        except BaseException:
+            for _, outputs in results:
+                _free_frames(outputs)
+            raise
+        if self.cache_dir and 'data' in combined:
+            self._store_cache(shards, results, combined['data'], unresolved)
+        if 'data' in combined:
+            combined['normalized'] = stats.normalize(combined['data'])
+        combined['stats'] = stats
+        logging.info(f"Ingested {len(shards)} shards from {len(self.file_paths)} files")
+        return combined
@@ -1,7 +1,25 @@
 # tests/test_algorithms.py
 
+import os
+import base64
 import unittest
+import tempfile
 import numpy as np
+try:
+    import qiskit
+except ImportError:
+    qiskit = None
+try:
+    import ntru
+except ImportError:
+    ntru = None
+from algorithms.drug_discovery.molecular_simulation import MolecularDynamics, ReplicaEnsemble, TrajectoryReader
+from algorithms.cryptography.bb84 import BB84Engine, random_bits
+from algorithms.cryptography.cascade import Cascade
+from algorithms.cryptography.privacy_amplification import secure_key_length, toeplitz_hash
+from algorithms.cryptography.qkd_session import run_session
+from algorithms.optimization.qaoa_exact import ExactEvaluator
+from quantum_backends.numpy_backend import NumpyBackend, NumpyCircuit
 
 def example_algorithm(data):
     """A simple example algorithm that returns the mean of the data."""
@@ -18,5 +36,309 @@ class TestAlgorithms(unittest.TestCase):
         with self.assertRaises(ValueError):
             example_algorithm(data)
 
+class TestMolecularDynamics(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.md = MolecularDynamics(num_particles=300, box_size=12.0, time_step=0.001, num_steps=5, temperature=1.0)
+
+    def test_neighbor_list_forces_match_all_pairs(self):
+        reference = self.md.compute_forces(self.md.positions, self.md.box_size, self.md.cutoff)
+        np.testing.assert_allclose(self.md.current_forces(), reference, rtol=1e-9, atol=1e-9)
+
+    def test_neighbor_list_reused_within_skin(self):
+        self.md.current_forces()
+        self.md.positions += 0.1 * self.md.skin
+        self.assertFalse(self.md.update_neighbor_list())
+        self.md.positions += self.md.skin
+        self.md.positions %= self.md.box_size
+        self.assertTrue(self.md.update_neighbor_list())
+
+    def test_streamed_trajectory_matches_in_memory(self):
+        positions, velocities = self.md.positions.copy(), self.md.velocities.copy()
+        in_memory = self.md.simulate(stride=2)
+        self.md.positions, self.md.velocities = positions, velocities
+        with tempfile.TemporaryDirectory() as directory:
+            streamed = self.md.simulate(output_dir=directory, stride=2, save_energies=True)
+            self.assertIsInstance(streamed, TrajectoryReader)
+            self.assertEqual(len(streamed), 3)
+            np.testing.assert_allclose(streamed[:], in_memory)
+            self.assertEqual(streamed.read('energies').shape, (3, 2))
+            np.testing.assert_allclose(streamed.read(particles=4), in_memory[:, 4])
+            np.testing.assert_allclose(streamed.read(frames=[0, 2], particles=[5, 1]), in_memory[[0, 2]][:, [5, 1]])
+            np.testing.assert_allclose(streamed[1:, 2:6, 0], in_memory[1:, 2:6, 0])
+
+    def test_compiled_verlet_matches_python_reference(self):
+        grid = np.indices((7, 7, 7)).reshape(3, -1).T[:self.md.num_particles]
+        self.md.positions = (grid + 0.5) * self.md.box_size / 7
+        positions, velocities = self.md.positions.copy(), self.md.velocities.copy()
+        compiled = self.md.simulate(stride=2, integrator='verlet')
+        self.md.positions, self.md.velocities = positions, velocities
+        dt, reference = self.md.time_step, []
+        forces = self.md.compute_forces(self.md.positions, self.md.box_size)
+        for step in range(self.md.num_steps):
+            self.md.velocities += 0.5 * dt * forces
+            self.md.positions = (self.md.positions + dt * self.md.velocities) % self.md.box_size
+            forces = self.md.compute_forces(self.md.positions, self.md.box_size)
+            self.md.velocities += 0.5 * dt * forces
+            self.md.apply_thermostat()
+            if step % 2 == 0:
+                reference.append(self.md.positions.copy())
+        np.testing.assert_allclose(compiled, np.array(reference), rtol=1e-7, atol=1e-7)
+
+    def test_verlet_rerun_from_new_state_matches_fresh_instance(self):
+        positions, velocities = self.md.positions.copy(), self.md.velocities.copy()
+        self.md.simulate(integrator='verlet')
+        self.md.positions, self.md.velocities = positions.copy(), velocities.copy()
+        rerun = self.md.simulate(integrator='verlet')
+        fresh = MolecularDynamics(num_particles=300, box_size=12.0, time_step=0.001, num_steps=5, temperature=1.0)
+        fresh.positions, fresh.velocities = positions.copy(), velocities.copy()
+        np.testing.assert_array_equal(rerun, fresh.simulate(integrator='verlet'))
+
+    def test_verlet_without_neighbor_list_uses_all_pairs(self):
+        grid = np.indices((7, 7, 7)).reshape(3, -1).T[:self.md.num_particles]
+        self.md.positions = (grid + 0.5) * self.md.box_size / 7
+        positions, velocities = self.md.positions.copy(), self.md.velocities.copy()
+        listed = self.md.simulate(integrator='verlet')
+        all_pairs = MolecularDynamics(num_particles=300, box_size=12.0, time_step=0.001, num_steps=5,
+                                      temperature=1.0, use_neighbor_list=False)
+        all_pairs.positions, all_pairs.velocities = positions, velocities
+        np.testing.assert_allclose(all_pairs.simulate(integrator='verlet'), listed, rtol=1e-9, atol=1e-9)
+        self.assertEqual(all_pairs.neighbor_rebuilds, 1)
+
+class TestReplicaEnsemble(unittest.TestCase):
+    def setUp(self):
+        grid = np.indices((5, 5, 5)).reshape(3, -1).T
+        self.ensemble = ReplicaEnsemble(num_replicas=3, num_particles=125, box_size=6.0, time_step=0.0005,
+                                        temperatures=[0.4, 0.6, 0.9], seed=7)
+        self.ensemble.positions[:] = (grid + 0.5) * 6.0 / 5
+
+    def test_replica_matches_single_system(self):
+        md = MolecularDynamics(num_particles=125, box_size=6.0, time_step=0.0005, num_steps=10, temperature=0.6)
+        md.positions = self.ensemble.positions[1].copy()
+        md.velocities = self.ensemble.velocities[1].copy()
+        self.ensemble.advance(10)
+        md.advance(10, integrator='verlet')
+        np.testing.assert_allclose(self.ensemble.positions[1], md.positions, rtol=1e-9, atol=1e-9)
+
+    def test_exchanges_permute_temperatures(self):
+        self.ensemble.run(10, exchange_interval=5)
+        self.assertEqual(self.ensemble.exchange_attempts, 2)
+        np.testing.assert_allclose(np.sort(self.ensemble.temperatures), [0.4, 0.6, 0.9])
+
+class TestBB84Engine(unittest.TestCase):
+    def test_noiseless_channel_gives_identical_keys(self):
+        result = BB84Engine().run(100000, np.random.default_rng(0))
+        self.assertEqual(result['qber'], 0.0)
+        np.testing.assert_array_equal(result['alice_key'], result['bob_key'])
+        self.assertAlmostEqual(result['sifted_length'] / 100000, 0.5, delta=0.01)
+        self.assertEqual(len(result['alice_key']) + result['disclosed'], result['sifted_length'])
+
+    def test_qber_reflects_noise_and_eavesdropping(self):
+        rng = np.random.default_rng(1)
+        self.assertAlmostEqual(BB84Engine(channel_error=0.05).run(400000, rng)['qber'], 0.05, delta=0.005)
+        self.assertAlmostEqual(BB84Engine(eavesdrop_rate=1.0).run(400000, rng)['qber'], 0.25, delta=0.01)
+
+    def test_chunking_does_not_change_statistics(self):
+        result = BB84Engine(channel_error=0.1, chunk_bits=1000).run(50001, np.random.default_rng(2))
+        error_rate = np.mean(result['alice_key'] != result['bob_key'])
+        self.assertAlmostEqual(error_rate, 0.1, delta=0.01)
+
+class TestCascade(unittest.TestCase):
+    def test_corrects_all_errors_near_shannon_limit(self):
+        result = BB84Engine(channel_error=0.03).run(200000, np.random.default_rng(3))
+        reconciled = Cascade(seed=4).reconcile(result['alice_key'], result['bob_key'], result['qber'])
+        np.testing.assert_array_equal(reconciled['key'], result['alice_key'])
+        self.assertGreater(reconciled['corrected'], 0)
+        length = len(result['alice_key'])
+        shannon = -(0.03 * np.log2(0.03) + 0.97 * np.log2(0.97)) * length
+        self.assertGreater(reconciled['leaked'], shannon)
+        self.assertLess(reconciled['leaked'], 1.3 * shannon)
+        self.assertEqual(reconciled['block_sizes'][1], 2 * reconciled['block_sizes'][0])
+
+    def test_identical_keys_leak_only_block_parities(self):
+        key = np.random.default_rng(5).integers(0, 2, 1000, dtype=np.uint8)
+        reconciled = Cascade(passes=2, seed=0).reconcile(key, key, 0.02)
+        np.testing.assert_array_equal(reconciled['key'], key)
+        self.assertEqual(reconciled['corrected'], 0)
+        # Blocks of 37 then 74 bits: 28 + 14 disclosed parities
+        self.assertEqual(reconciled['leaked'], 28 + 14)
+
+    def test_zero_estimated_qber_still_finds_even_error_counts(self):
+        key = np.random.default_rng(7).integers(0, 2, 4096, dtype=np.uint8)
+        for errors in ([0, 4095], np.random.default_rng(8).choice(4096, 4, replace=False)):
+            noisy = key.copy()
+            noisy[errors] ^= 1
+            reconciled = Cascade(seed=9).reconcile(key, noisy, 0.0)
+            np.testing.assert_array_equal(reconciled['key'], key)
+            self.assertEqual(reconciled['corrected'], len(errors))
+            self.assertEqual(reconciled['block_sizes'][0], 4096 // 8)
+
+class TestPrivacyAmplification(unittest.TestCase):
+    def test_fft_hash_matches_dense_toeplitz_product(self):
+        key = np.random.default_rng(6).integers(0, 2, 257, dtype=np.uint8)
+        diagonals = random_bits(np.random.default_rng(11), 100 + 257 - 1)
+        rows, columns = np.indices((100, 257))
+        matrix = diagonals[rows - columns + 257 - 1]
+        np.testing.assert_array_equal(toeplitz_hash(key, 100, seed=11), matrix @ key % 2)
+
+    def test_fft_hash_is_exact_for_large_keys(self):
+        length, output_length = 4_000_000, 2_000_000
+        key = np.random.default_rng(12).integers(0, 2, length, dtype=np.uint8)
+        hashed = toeplitz_hash(key, output_length, seed=13)
+        diagonals = random_bits(np.random.default_rng(13), output_length + length - 1).astype(np.float64)
+        reversed_key = key[::-1].astype(np.float64)
+        rows = np.concatenate(([0, output_length - 1], np.random.default_rng(14).choice(output_length, 62)))
+        # Row i of the Toeplitz product pairs diagonals[i:i + n] with the reversed key; sums stay exact in float64
+        direct = [int(diagonals[row:row + length] @ reversed_key) & 1 for row in rows]
+        np.testing.assert_array_equal(hashed[rows], direct)
+
+    def test_secure_key_length(self):
+        # h(0.11) is about 0.5; 2 log2(1 / 2**-10) = 20 bits for epsilon
+        self.assertEqual(secure_key_length(10000, 0.11, 1000, 2 ** -10), 3980)
+        self.assertEqual(secure_key_length(100, 0.2, 90, 1e-10), 0)
+
+class TestQKDSession(unittest.TestCase):
+    def test_session_is_reproducible_and_verified(self):
+        first = run_session(50000, channel_error=0.03, seed=np.random.SeedSequence(8))
+        second = run_session(50000, channel_error=0.03, seed=np.random.SeedSequence(8))
+        np.testing.assert_array_equal(first['key'], second['key'])
+        self.assertTrue(first['verified'])
+        self.assertEqual(len(first['key']), (first['key_length'] + 7) // 8)
+        self.assertGreater(first['key_length'], 0)
+
+    def test_eavesdropping_leaves_no_secure_key(self):
+        session = run_session(50000, eavesdrop_rate=1.0, seed=9)
+        self.assertAlmostEqual(session['qber'], 0.25, delta=0.02)
+        self.assertEqual(session['key_length'], 0)
+
+class TestExactEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.cost_function = [[1, 0, 1, 1], [0, 1, 1, 0], [1, 1, 0, 1], [0, 1, 1, 1]]
+        self.evaluator = ExactEvaluator(4, self.cost_function)
+        rng = np.random.default_rng(12)
+        self.gammas, self.betas = rng.random((9, 3)) * np.pi, rng.random((9, 3)) * np.pi
+
+    def circuit(self, gamma, beta):
+        """The QAOA.create_circuit gate sequence on the NumPy backend."""
+        circuit = NumpyCircuit(4).h(range(4))
+        for i in range(len(gamma)):
+            for j in range(4):
+                if self.cost_function[j][i] == 1:
+                    circuit.rz(2 * gamma[i], j)
+            circuit.rx(2 * beta[i], range(4))
+        return circuit
+
+    def test_statevectors_match_numpy_backend(self):
+        backend = NumpyBackend(4)
+        states = self.evaluator.statevectors(3, self.gammas, self.betas)
+        for state, gamma, beta in zip(states, self.gammas, self.betas):
+            np.testing.assert_allclose(state, backend.statevector(self.circuit(gamma, beta)), atol=1e-12)
+
+    def test_expectation_uses_cost_diagonal(self):
+        bits = (np.arange(16)[:, None] >> np.arange(4)) & 1
+        cost = np.asarray(self.cost_function)
+        np.testing.assert_allclose(self.evaluator.cost_diagonal(), [x @ cost @ x for x in bits])
+        probabilities = NumpyBackend(4).probabilities(self.circuit(self.gammas[0], self.betas[0]))
+        self.assertAlmostEqual(self.evaluator.expectation(3, self.gammas[:1], self.betas[:1])[0],
+                               probabilities @ self.evaluator.cost_diagonal(), places=10)
+
+    def test_chunked_batches_match_single_evaluations(self):
+        batched = self.evaluator.expectation(3, self.gammas, self.betas)
+        chunked = ExactEvaluator(4, self.cost_function, chunk_amplitudes=32).expectation(3, self.gammas, self.betas)
+        single = [self.evaluator.expectation(3, gamma, beta)[0] for gamma, beta in zip(self.gammas, self.betas)]
+        np.testing.assert_allclose(chunked, batched, rtol=1e-12)
+        np.testing.assert_allclose(single, batched, rtol=1e-12)
+
+@unittest.skipUnless(qiskit, "qiskit is not installed")
+class TestQKDCircuits(unittest.TestCase):
+    def test_bb84_template_is_transpiled_once_per_width(self):
+        from algorithms.cryptography.qkd import QKD
+        from quantum_backends.transpile_cache import default_cache
+        QKD(num_bits=6).generate_key()
+        hits = default_cache.hits
+        key = QKD(num_bits=6).generate_key()
+        self.assertEqual(default_cache.hits, hits + 1)
+        self.assertEqual(len(key), 6)
+
+    def test_run_multiple_keys_do_not_depend_on_processes(self):
+        from algorithms.cryptography.qkd import QKD
+        serial = QKD(num_bits=20000, num_runs=3, channel_error=0.02)
+        parallel = QKD(num_bits=20000, num_runs=3, channel_error=0.02)
+        keys = serial.run_multiple(processes=1, seed=13)
+        self.assertEqual(parallel.run_multiple(processes=3, seed=13), keys)
+        self.assertEqual([len(key) for key in keys], [session['key_length'] for session in serial.sessions])
+        self.assertTrue(all(session['verified'] for session in parallel.sessions))
+        self.assertTrue(set(keys[0]) <= {0, 1})
+
+    def test_circuit_path_matches_noiseless_engine(self):
+        from algorithms.cryptography.qkd import QKD
+        result = QKD(num_bits=60).simulate_circuit(rng=np.random.default_rng(10), max_width=12)
+        self.assertEqual(result['qber'], 0.0)
+        np.testing.assert_array_equal(result['alice_key'], result['bob_key'])
+
+@unittest.skipUnless(qiskit, "qiskit is not installed")
+class TestQAOAOptimize(unittest.TestCase):
+    def setUp(self):
+        from algorithms.optimization.qaoa import QAOA
+        self.qaoa = QAOA(3, [[1, 0, 1], [0, 1, 0], [1, 1, 0]])
+
+    def test_every_driver_reaches_its_reported_value(self):
+        for method in ('random', 'gradient', 'spsa', 'cobyla'):
+            with self.subTest(method=method):
+                probabilities, value = self.qaoa.optimize(2, iterations=30, method=method, seed=1, exact=True)
+                gamma, beta = self.qaoa.best_parameters
+                self.assertAlmostEqual(self.qaoa.expectation(2, [gamma], [beta])[0], value, places=10)
+                self.assertAlmostEqual(sum(probabilities.values()), 1.0, places=10)
+                history = self.qaoa.history[0]
+                self.assertTrue(np.all(np.diff(history) <= 0))
+                self.assertLessEqual(value, history[0])
+
+    def test_sampled_optimum_returns_the_scored_counts(self):
+        counts, value = self.qaoa.optimize(2, iterations=20, method='random', seed=2, shots=256)
+        self.assertEqual(self.qaoa.evaluate_counts(counts), value)
+        self.assertEqual(sum(counts.values()), 256)
+
+    def test_seeded_restarts_do_not_depend_on_processes(self):
+        serial = self.qaoa.optimize(2, iterations=10, method='spsa', restarts=3, seed=3, shots=256)
+        serial_parameters, serial_history = self.qaoa.best_parameters, self.qaoa.history
+        parallel = self.qaoa.optimize(2, iterations=10, method='spsa', restarts=3, seed=3, shots=256, processes=3)
+        self.assertEqual(serial, parallel)
+        np.testing.assert_array_equal(np.concatenate(serial_parameters), np.concatenate(self.qaoa.best_parameters))
+        self.assertEqual(serial_history, self.qaoa.history)
+
+@unittest.skipUnless(ntru, "ntru is not installed")
+class TestHybridEncryption(unittest.TestCase):
+    def setUp(self):
+        from algorithms.cryptography.post_quantum_cryptography import PostQuantumCryptography
+        # generate_keypair writes keys.json to the working directory
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory.name)
+        self.pqc = PostQuantumCryptography()
+        self.pqc.generate_keypair()
+
+    def test_round_trip(self):
+        message = "Hello, Quantum World! " * 500
+        self.assertEqual(self.pqc.hybrid_decrypt(self.pqc.hybrid_encrypt(message)), message)
+
+    def test_tampering_is_rejected(self):
+        encrypted = self.pqc.hybrid_encrypt("attack at dawn")
+        for field in ('ciphertext', 'tag', 'nonce'):
+            with self.subTest(field=field):
+                raw = bytearray(base64.b64decode(encrypted[field]))
+                raw[0] ^= 1
+                with self.assertRaises(ValueError):
+                    self.pqc.hybrid_decrypt({**encrypted, field: base64.b64encode(bytes(raw)).decode()})
+        with self.assertRaises(ValueError):
+            self.pqc.hybrid_decrypt({**encrypted, 'encapsulated_key': encrypted['encapsulated_key'][::-1]})
+
+    def test_session_key_fits_default_parameters(self):
+        from algorithms.cryptography.post_quantum_cryptography import SESSION_KEY_BYTES
+        self.pqc.check_session_key_capacity()
+        encapsulated = self.pqc.hybrid_encrypt("x")['encapsulated_key']
+        session_key = self.pqc.ntru.decrypt(encapsulated, self.pqc.private_key)
+        self.assertEqual(len(bytes.fromhex(session_key)), SESSION_KEY_BYTES)
+
 if __name__ == '__main__':
     unittest.main()
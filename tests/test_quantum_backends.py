@@ -0,0 +1,247 @@
+# tests/test_quantum_backends.py
+
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+import numpy as np
+try:
+    import qiskit
+except ImportError:
+    qiskit = None
+try:
+    import cirq
+except ImportError:
+    cirq = None
+from quantum_backends.base import QuantumBackend
+from quantum_backends.numpy_backend import NumpyBackend, NumpyCircuit
+from quantum_backends.shot_engine import AliasTable, ShotEngine
+from quantum_backends.counts import Counts
+from quantum_backends.async_executor import AsyncExecutor, is_local_simulator
+
+class SlowBackend(QuantumBackend):
+    """Backend that sleeps per circuit and records how many jobs overlap."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def run_batch(self, circuits, shots=None):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return [{'0': circuit} for circuit in circuits]
+
+class TestNumpyBackend(unittest.TestCase):
+    def setUp(self):
+        self.backend = NumpyBackend(3, seed=1)
+
+    def test_hadamard_layer_is_uniform(self):
+        circuit = self.backend.create_circuit()
+        np.testing.assert_allclose(self.backend.probabilities(circuit), np.full(8, 1 / 8))
+        counts = self.backend.execute_circuit(circuit, shots=4000)
+        self.assertEqual(sum(counts.values()), 4000)
+        self.assertEqual(len(counts), 8)
+
+    def test_entangling_gates_and_bit_order(self):
+        circuit = NumpyCircuit(3).h(0).cx(0, 2).swap(2, 1).x(0).measure_all()
+        probabilities = self.backend.probabilities(circuit)
+        np.testing.assert_allclose(probabilities[[0b001, 0b010]], [0.5, 0.5])
+        self.assertEqual(set(self.backend.execute_circuit(circuit)), {'001', '010'})
+
+    def test_fused_rotations_match_single_rotation(self):
+        split = NumpyCircuit(2).rx(0.3, [0, 1]).rx(0.4, [0, 1]).cz(0, 1).ry(1.1, 1)
+        single = NumpyCircuit(2).rx(0.7, [0, 1]).cz(0, 1).ry(1.1, 1)
+        np.testing.assert_allclose(self.backend.statevector(split), self.backend.statevector(single), atol=1e-12)
+
+    def test_run_batch_common_format(self):
+        self.assertIsInstance(self.backend, QuantumBackend)
+        circuits = [NumpyCircuit(3).x(0).measure_all(), NumpyCircuit(3).x([1, 2]).measure_all()]
+        self.assertEqual(self.backend.run_batch(circuits, shots=10), [{'001': 10}, {'110': 10}])
+        self.assertEqual(self.backend.run(circuits[0], shots=5), {'001': 5})
+
+class TestShotEngine(unittest.TestCase):
+    def test_alias_table_reproduces_distribution(self):
+        rng = np.random.default_rng(0)
+        probabilities = rng.random(64) ** 4
+        probabilities /= probabilities.sum()
+        table = AliasTable(probabilities)
+        # Each column's own share plus what other columns alias to it must equal its probability
+        implied = table.probability.copy()
+        np.add.at(implied, table.alias, 1 - table.probability)
+        np.testing.assert_allclose(implied / probabilities.size, probabilities, atol=1e-12)
+        samples = np.bincount(table.sample(200000, rng), minlength=64) / 200000
+        np.testing.assert_allclose(samples, probabilities, atol=0.01)
+
+    def test_distribution_is_computed_once(self):
+        engine = ShotEngine(seed=0)
+        calls = []
+        compute = lambda: calls.append(1) or np.array([0.25, 0.75])
+        for method in ('multinomial', 'alias'):
+            self.assertEqual(engine.counts('key', compute, 1000, method=method).sum(), 1000)
+        self.assertEqual(engine.counts('key', compute, 10**6).sum(), 10**6)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((engine.hits, engine.misses), (2, 1))
+
+    def test_numpy_backend_reuses_distribution(self):
+        backend = NumpyBackend(2, seed=0)
+        first = backend.execute_circuit(NumpyCircuit(2).h(0).cx(0, 1).measure_all(), shots=1000)
+        second = backend.execute_circuit(NumpyCircuit(2).h(0).cx(0, 1).measure_all(), shots=1000)
+        self.assertEqual(set(first) | set(second), {'00', '11'})
+        self.assertEqual(backend.shot_engine.misses, 1)
+        self.assertEqual(backend.shot_engine.hits, 1)
+
+class TestCounts(unittest.TestCase):
+    def test_mapping_and_queries(self):
+        counts = Counts.from_dict({'011': 5, '100': 3, '001': 2})
+        self.assertEqual(counts, {'011': 5, '100': 3, '001': 2})
+        self.assertEqual(counts['011'], counts[0b011])
+        self.assertEqual(counts.shots, 10)
+        self.assertEqual(counts.most_frequent(), 0b011)
+        self.assertEqual(counts.top_k(2), [('011', 5), ('100', 3)])
+        self.assertEqual(counts.marginal([0]), {'1': 7, '0': 3})
+        self.assertEqual(counts.marginal([2, 0]), {'10': 7, '01': 3})
+        self.assertAlmostEqual(counts.expectation(np.arange(8)), (3 * 5 + 4 * 3 + 1 * 2) / 10)
+        with self.assertRaises(KeyError):
+            counts['111']
+
+    def test_sparse_merge_matches_dense(self):
+        rng = np.random.default_rng(0)
+        first, second = rng.integers(0, 1 << 20, 500), rng.integers(0, 1 << 20, 500)
+        merged = Counts.from_samples(first, 20) + Counts.from_samples(second, 20)
+        expected = Counts.from_samples(np.concatenate((first, second)), 20)
+        self.assertEqual(merged, expected)
+        self.assertEqual(merged.shots, 1000)
+        np.testing.assert_array_equal(merged.marginal(range(4)).to_array(),
+                                      np.bincount(np.concatenate((first, second)) & 15, minlength=16))
+
+    def test_dense_storage_only_when_well_populated(self):
+        few = Counts.from_dict({'0' * 16: 3, '1' * 16: 2})
+        self.assertIsNone(few._dense)
+        self.assertEqual(few.to_array().size, 1 << 16)
+        many = Counts.from_samples(np.arange(64) % 16, 4)
+        self.assertIsNotNone(many._dense)
+        self.assertEqual(few.marginal(range(4)), {'0000': 3, '1111': 2})
+        self.assertEqual(many.marginal([0]), {'0': 32, '1': 32})
+
+@unittest.skipUnless(cirq, "cirq is not installed")
+class TestCirqBackend(unittest.TestCase):
+    def test_execute_circuit_matches_run_batch_layout(self):
+        from quantum_backends.cirq_backend import CirqBackend
+        backend = CirqBackend(3)
+        qubits = cirq.LineQubit.range(3)
+        sampled = cirq.Circuit(cirq.X(qubits[0]), cirq.measure(*qubits, key='z'))
+        # A mid-circuit measurement forces shot-by-shot simulation
+        simulated = cirq.Circuit(cirq.measure(qubits[2], key='m'), cirq.X(qubits[0]), cirq.measure(*qubits, key='z'))
+        for circuit in (sampled, simulated):
+            counts = backend.execute_circuit(circuit, shots=20)
+            self.assertIsInstance(counts, Counts)
+            self.assertEqual(counts, {'001': 20})
+            self.assertEqual(counts, backend.run_batch([circuit], shots=20)[0])
+
+class TestAsyncExecutor(unittest.TestCase):
+    def test_results_in_order_within_window(self):
+        backend = SlowBackend(0.05)
+        self.assertTrue(is_local_simulator(backend))
+
+        async def main():
+            async with AsyncExecutor(backend, max_in_flight=2) as executor:
+                return await executor.map(range(6))
+
+        self.assertEqual(asyncio.run(main()), [{'0': index} for index in range(6)])
+        self.assertEqual(backend.peak, 2)
+
+    def test_timeout_and_cancel(self):
+        async def main():
+            async with AsyncExecutor(SlowBackend(0.3), max_in_flight=1) as executor:
+                slow = executor.submit('slow', timeout=0.05)
+                queued = executor.submit('queued')
+                queued.cancel()
+                with self.assertRaises(asyncio.TimeoutError):
+                    await slow
+                with self.assertRaises(asyncio.CancelledError):
+                    await queued
+                return await executor.submit('next')
+
+        self.assertEqual(asyncio.run(main()), {'0': 'next'})
+
+    def test_timeout_counts_time_waiting_for_a_slot(self):
+        async def main():
+            async with AsyncExecutor(SlowBackend(0.3), max_in_flight=1) as executor:
+                running = executor.submit('running')
+                waiting = executor.submit('waiting', timeout=0.1)
+                start = time.monotonic()
+                with self.assertRaises(asyncio.TimeoutError):
+                    await waiting
+                self.assertLess(time.monotonic() - start, 0.25)
+                return await running
+
+        self.assertEqual(asyncio.run(main()), {'0': 'running'})
+
+@unittest.skipUnless(qiskit, "qiskit is not installed")
+class TestTranspileCache(unittest.TestCase):
+    def circuit(self, angle, name=None):
+        from qiskit import QuantumCircuit
+        circuit = QuantumCircuit(2, name=name)
+        circuit.h(0)
+        circuit.cx(0, 1)
+        circuit.rz(angle, 1)
+        circuit.measure_all()
+        return circuit
+
+    def test_fingerprint_is_structural(self):
+        from qiskit.circuit import Parameter
+        from quantum_backends.transpile_cache import circuit_fingerprint
+        self.assertEqual(circuit_fingerprint(self.circuit(0.5, 'a')), circuit_fingerprint(self.circuit(0.5, 'b')))
+        self.assertNotEqual(circuit_fingerprint(self.circuit(0.5)), circuit_fingerprint(self.circuit(0.6)))
+        theta = Parameter('theta')
+        self.assertEqual(circuit_fingerprint(self.circuit(theta)), circuit_fingerprint(self.circuit(theta)))
+
+    def test_lru_evicts_least_recently_used(self):
+        from quantum_backends.transpile_cache import TranspileCache
+        cache = TranspileCache(maxsize=2)
+        for angle in (0.1, 0.2, 0.1, 0.3, 0.2):
+            cache.transpile(self.circuit(angle), basis_gates=['u', 'cx'])
+        # 0.2 was evicted by 0.3 after 0.1 had been used again
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+
+    def test_disk_tier_survives_a_new_cache(self):
+        from quantum_backends.transpile_cache import TranspileCache
+        with tempfile.TemporaryDirectory() as directory:
+            first = TranspileCache(cache_dir=directory).transpile(self.circuit(0.5, 'x'), basis_gates=['u', 'cx'])
+            second_cache = TranspileCache(cache_dir=directory)
+            second = second_cache.transpile(self.circuit(0.5, 'y'), basis_gates=['u', 'cx'])
+            self.assertEqual((second_cache.hits, second_cache.misses), (1, 0))
+            self.assertEqual(second.name, 'y')
+            self.assertEqual(second.data, first.data)
+
+    def test_hit_returns_callers_parameters(self):
+        from qiskit.circuit import Parameter
+        from quantum_backends.transpile_cache import TranspileCache
+        cache = TranspileCache()
+        cache.transpile(self.circuit(Parameter('theta')), basis_gates=['u', 'cx'])
+        theta = Parameter('theta')
+        transpiled = cache.transpile(self.circuit(theta), basis_gates=['u', 'cx'])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(set(transpiled.parameters), {theta})
+        self.assertEqual(transpiled.assign_parameters({theta: 0.5}).num_parameters, 0)
+
+    def test_run_batch_transpiles_through_the_cache(self):
+        from quantum_backends.qiskit_backend import QiskitBackend, build_noise_model
+        from quantum_backends.transpile_cache import TranspileCache
+        backend = QiskitBackend(shots=64, transpile_cache=TranspileCache())
+        noise_model = build_noise_model(0.01, 0.02)
+        circuits = [self.circuit(0.1), self.circuit(0.2), self.circuit(0.1)]
+        first = backend.run_batch(circuits, noise_model=noise_model)
+        second = backend.run_batch(circuits[:2], noise_model=noise_model)
+        self.assertEqual((backend.transpile_cache.hits, backend.transpile_cache.misses), (3, 2))
+        self.assertTrue(all(sum(counts.values()) == 64 for counts in first + second))
+
+if __name__ == '__main__':
+    unittest.main()
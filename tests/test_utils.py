@@ -1,9 +1,14 @@
 # tests/test_utils.py
 
+import os
+import sqlite3
+import tempfile
 import unittest
+import numpy as np
 import pandas as pd
 from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
+from utils.data_processor import DataProcessor, RunningStats
+from utils.ingest_pipeline import IngestPipeline
 
 class TestDataLoader(unittest.TestCase):
     def setUp(self):
@@ -19,6 +24,119 @@ class TestDataLoader(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.loader.load_csv()
 
+class TestDataLoaderStreaming(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'measurements.csv')
+        pd.DataFrame({
+            'value': np.linspace(0, 1, 25),
+            'qubit': ['q0', 'q1'] * 12 + ['q0'],
+            'shots': np.arange(25),
+        }).to_csv(self.path, index=False)
+        self.loader = DataLoader(file_path=self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_iter_csv_bounded_chunks(self):
+        chunks = list(self.loader.iter_csv(chunksize=10, columns=['value', 'shots']))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(list(chunks[0].columns), ['value', 'shots'])
+
+    def test_iter_csv_compact_dtypes(self):
+        chunk = next(self.loader.iter_csv(chunksize=10, compact=True, dtype={'shots': np.int32}))
+        self.assertEqual(chunk['value'].dtype, np.float32)
+        self.assertEqual(chunk['qubit'].dtype.name, 'category')
+        self.assertEqual(chunk['shots'].dtype, np.int32)
+
+    def test_load_csv_cache_round_trip_and_invalidation(self):
+        loader = DataLoader(file_path=self.path, cache_dir=os.path.join(self.directory.name, 'cache'))
+        parsed = loader.load_csv()
+        cached = loader.load_csv()
+        pd.testing.assert_frame_equal(parsed, cached)
+        pd.DataFrame({'value': [2.0]}).to_csv(self.path, index=False)
+        os.utime(self.path, ns=(0, 0))
+        self.assertEqual(list(loader.load_csv()['value']), [2.0])
+        self.assertEqual(len(os.listdir(loader.cache.cache_dir)), 1)
+
+    def test_iter_from_database_partitions(self):
+        database = os.path.join(self.directory.name, 'measurements.db')
+        with sqlite3.connect(database) as connection:
+            pd.read_csv(self.path).to_sql('measurements', connection, index=False)
+        chunks = list(self.loader.iter_from_database('SELECT rowid AS row_id, * FROM measurements', database,
+                                                     'row_id', num_partitions=4, max_workers=2))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(list(pd.concat(chunks)['row_id']), list(range(1, 26)))
+
+    def test_iter_from_database_uses_only_dbapi_cursors(self):
+        database = os.path.join(self.directory.name, 'measurements.db')
+        with sqlite3.connect(database) as connection:
+            pd.read_csv(self.path).to_sql('measurements', connection, index=False)
+
+        class CursorOnlyConnection:
+            """DB-API connection without sqlite3's execute() shortcut."""
+            def __init__(self):
+                self._connection = sqlite3.connect(database, check_same_thread=False)
+            def cursor(self):
+                return self._connection.cursor()
+            def close(self):
+                self._connection.close()
+
+        chunks = list(self.loader.iter_from_database('SELECT * FROM measurements', None, 'shots',
+                                                     num_partitions=3, connect=CursorOnlyConnection))
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), pd.read_csv(self.path))
+
+    def test_ingest_pipeline_matches_serial_processing(self):
+        second_path = os.path.join(self.directory.name, 'more.csv')
+        pd.read_csv(self.path).to_csv(second_path, index=False)
+        pipeline = IngestPipeline([self.path, second_path], condition='value > 0.5',
+                                  feature_columns=['value', 'shots'], processes=2, shard_bytes=64)
+        self.assertGreater(len(pipeline.shards()), 2)
+        results = pipeline.run()
+        full = pd.concat([pd.read_csv(self.path), pd.read_csv(second_path)], ignore_index=True)
+        pd.testing.assert_frame_equal(results['data'], full)
+        pd.testing.assert_frame_equal(results['filtered'], full.query('value > 0.5').reset_index(drop=True))
+        self.assertEqual(results['normalized']['shots'].max(), 1.0)
+
+    def test_ingest_pipeline_reuses_columnar_cache(self):
+        cache_dir = os.path.join(self.directory.name, 'cache')
+        pipeline = IngestPipeline([self.path], condition='value > 0.5', filter_columns=['shots'],
+                                  processes=2, shard_bytes=64, cache_dir=cache_dir)
+        parsed = pipeline.run()
+        pd.testing.assert_frame_equal(DataLoader(file_path=self.path, cache_dir=cache_dir).cache.load(
+            self.path, {'columns': None, 'dtype': None}), parsed['data'])
+        shards = pipeline.shards()
+        self.assertTrue(all(cache is not None for *_, cache in shards))
+        self.assertGreater(len(shards), 1)
+        cached = pipeline.run()
+        pd.testing.assert_frame_equal(cached['data'], parsed['data'])
+        pd.testing.assert_frame_equal(cached['filtered'], parsed['filtered'])
+        self.assertEqual(list(cached['filtered'].columns), ['shots'])
+
+    def test_ingest_pipeline_shares_one_schema_across_shards(self):
+        late_text_path = os.path.join(self.directory.name, 'late_text.csv')
+        frame = pd.read_csv(self.path)
+        frame['note'] = [None] * 20 + ['drift', 'drift', 'recalibrated', None, 'drift']
+        frame.to_csv(late_text_path, index=False)
+        pipeline = IngestPipeline([late_text_path], condition='value > 0.5', processes=2, shard_bytes=64)
+        self.assertTrue(pipeline.shards()[0][1] < 20 * 8 < pipeline.shards()[-1][1])
+        results = pipeline.run()
+        expected = pd.read_csv(late_text_path)
+        pd.testing.assert_frame_equal(results['data'], expected)
+        pd.testing.assert_frame_equal(results['filtered'], expected.query('value > 0.5').reset_index(drop=True))
+        self.assertEqual(results['stats'].columns, ['value', 'shots'])
+
+    def test_ingest_pipeline_frees_shared_memory_when_a_shard_fails(self):
+        broken_path = os.path.join(self.directory.name, 'broken.csv')
+        with open(broken_path, 'w') as f:
+            f.write('value,qubit,shots\n0.5,q0,1\n0.6,q1,2,extra,fields\n')
+        blocks_before = set(os.listdir('/dev/shm'))
+        pipeline = IngestPipeline([self.path, broken_path], processes=2, shard_bytes=64)
+        with self.assertRaises(pd.errors.ParserError):
+            pipeline.run()
+        leaked = [name for name in set(os.listdir('/dev/shm')) - blocks_before if name.startswith('psm_')]
+        self.assertEqual(leaked, [])
+
 class TestDataProcessor(unittest.TestCase):
     def setUp(self):
         self.data = pd.DataFrame({
@@ -41,5 +159,53 @@ class TestDataProcessor(unittest.TestCase):
         features = self.processor.extract_features(['feature1', 'feature2'])
         self.assertEqual(features.shape[1], 2)
 
+    def test_pipeline_matches_eager_steps(self):
+        result = (self.processor.lazy()
+                  .with_column('total', lambda a, b: a + b, ['feature1', 'feature2'])
+                  .filter('value > 0.2')
+                  .normalize(['feature1'])
+                  .select(['feature1', 'total'])
+                  .collect())
+        filtered = self.processor.filter_data('value > 0.2')
+        expected = pd.DataFrame({
+            'feature1': (filtered['feature1'] - 3) / 2,
+            'total': filtered['feature1'] + filtered['feature2'],
+        })
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_pipeline_plan_pushes_filter_and_prunes(self):
+        pipeline = (self.processor.lazy()
+                    .with_column('unused', lambda a: a * 2, ['feature2'], elementwise=True)
+                    .filter('value > 0.3')
+                    .select(['feature1']))
+        steps, source_columns = pipeline.plan()
+        self.assertEqual([step[0] for step in steps], ['filter', 'select'])
+        self.assertEqual(source_columns, ['value', 'feature1'])
+
+    def test_pipeline_keeps_filter_after_column_wise_transform(self):
+        pipeline = (self.processor.lazy()
+                    .with_column('centered', lambda a: a - a.mean(), ['feature1'])
+                    .filter('value > 0.2')
+                    .select(['centered']))
+        steps, _ = pipeline.plan()
+        self.assertEqual([step[0] for step in steps], ['transform', 'filter', 'select'])
+        filtered = self.processor.filter_data('value > 0.2')
+        np.testing.assert_allclose(pipeline.collect()['centered'], filtered['feature1'] - 3.0)
+
+    def test_pipeline_keeps_extension_dtypes(self):
+        data = self.data.assign(label=pd.array(['a', None, 'b', None, None], dtype='string'))
+        result = DataProcessor(data).lazy().filter('value > 0.3').collect()
+        self.assertEqual(result['label'].dtype, data['label'].dtype)
+        self.assertTrue(result['label'].isna().all())
+
+    def test_running_stats_merge_matches_full_data(self):
+        first = RunningStats().update(self.data.iloc[:2])
+        second = RunningStats().update(self.data.iloc[2:])
+        stats = first.merge(second)
+        np.testing.assert_allclose(stats.mean, self.data.mean().to_numpy())
+        np.testing.assert_allclose(stats.std().to_numpy(), self.data.std().to_numpy())
+        self.assertAlmostEqual(stats.quantile(0.5)['feature1'], 3.0)
+        pd.testing.assert_frame_equal(self.processor.normalize(stats=stats), self.processor.normalize())
+
 if __name__ == '__main__':
     unittest.main()